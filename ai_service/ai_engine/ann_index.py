@@ -0,0 +1,428 @@
+from typing import Dict, Any, Callable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+ANN_INDEX_TYPES = ("ivf_flat", "hnsw", "ivf_pq", "sq8", "fp16", "pq")
+
+RERANKED_INDEX_TYPES = ("ivf_pq", "sq8", "fp16", "pq")
+
+
+def ann_snapshot_paths(storage_path: Path, name: str, generation: int) -> Tuple[Path, Path]:
+    storage_path = Path(storage_path)
+    return storage_path / f"{name}.ann.{generation}.faiss", storage_path / f"{name}.ann.{generation}.json"
+
+
+def rerank(
+    queries: np.ndarray,
+    rows: np.ndarray,
+    lookup: Callable[[np.ndarray], np.ndarray],
+    top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    num_queries, num_candidates = rows.shape
+    vectors = lookup(np.maximum(rows, 0).reshape(-1)).reshape(num_queries, num_candidates, -1)
+    scores = np.einsum("qd,qcd->qc", queries, vectors)
+    scores = np.where(rows >= 0, scores, -np.inf).astype(np.float32)
+
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+
+class ReadWriteLock:
+
+    def __init__(self):
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writing = False
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._writing and self._writers_waiting == 0)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                self._condition.wait_for(lambda: self._readers == 0 and not self._writing)
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class AnnRowIndex:
+
+    def __init__(self, index, lock: ReadWriteLock, exact_index=None, rerank_factor: int = 1):
+        self.index = index
+        self.lock = lock
+        self.exact_index = exact_index
+        self.rerank_factor = rerank_factor
+
+    def search(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.exact_index is None:
+            with self.lock.reading():
+                return self.index.search(queries, top_k)
+
+        with self.lock.reading():
+            _, rows = self.index.search(queries, min(self.index.ntotal, top_k * self.rerank_factor))
+        rows = np.where(rows < self.exact_index.ntotal, rows, -1)
+        return rerank(queries, rows, self.exact_index.reconstruct_batch, top_k)
+
+
+class AnnIndexManager:
+
+    def __init__(
+        self,
+        dimension: int,
+        index_type: str = "none",
+        promotion_threshold: int = 50000,
+        min_recall: float = 0.9,
+        recall_k: int = 10,
+        rebuild_growth: float = 2.0,
+        rerank_factor: int = 4
+    ):
+        self.dimension = dimension
+        self.index_type = index_type if index_type in ANN_INDEX_TYPES else "none"
+        self.promotion_threshold = promotion_threshold
+        self.min_recall = min_recall
+        self.recall_k = recall_k
+        self.rebuild_growth = max(1.1, rebuild_growth)
+        self.rerank_factor = max(1, rerank_factor)
+
+        self.index = None
+        self.built_size = 0
+        self.attempted_size = 0
+        self.search_param = None
+        self.last_recall = None
+        self.last_build_seconds = None
+        self.builds = 0
+        self.rejected_builds = 0
+        self.loaded_from_disk = False
+        self._task = None
+        self._epoch = 0
+        self._lock = ReadWriteLock()
+        self._executor = None
+
+    @property
+    def enabled(self) -> bool:
+        return FAISS_AVAILABLE and self.index_type != "none"
+
+    @property
+    def building(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def reset(self):
+        self.index = None
+        self.built_size = 0
+        self.attempted_size = 0
+        self.loaded_from_disk = False
+        self._epoch += 1
+
+    @property
+    def reranked(self) -> bool:
+        return self.index_type in RERANKED_INDEX_TYPES
+
+    def row_index(self, exact_index) -> Optional[AnnRowIndex]:
+        if self.index is None:
+            return None
+        if self.reranked:
+            return AnnRowIndex(self.index, self._lock, exact_index, self.rerank_factor)
+        return AnnRowIndex(self.index, self._lock)
+
+    async def add(self, vectors: np.ndarray, start_row: int):
+        index = self.index
+        if index is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        aligned = await loop.run_in_executor(self._get_executor(), self._append, index, vectors, start_row)
+        if not aligned and index is self.index:
+            logger.warning(f"{self.index_type} index fell behind the exact index, dropping it until the next rebuild")
+            self.reset()
+
+    def save(self, storage_path: Path, name: str, generation: int):
+        index_path, meta_path = ann_snapshot_paths(storage_path, name, generation)
+        index = self.index
+        if index is not None:
+            tmp_path = index_path.with_name(index_path.name + ".tmp")
+            with self._lock.reading():
+                faiss.write_index(index, str(tmp_path))
+                rows = index.ntotal
+            os.replace(tmp_path, index_path)
+
+            meta = {
+                "index_type": self.index_type,
+                "dimension": self.dimension,
+                "rows": rows,
+                "built_size": self.built_size,
+                "search_param": self.search_param,
+                "recall_at_k": self.last_recall,
+                "recall_k": self.recall_k
+            }
+            tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+
+        for path in Path(storage_path).glob(f"{name}.ann.*"):
+            if index is None or path not in (index_path, meta_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    async def load(self, storage_path: Path, name: str, generation: int, exact_index):
+        index_path, meta_path = ann_snapshot_paths(storage_path, name, generation)
+        if not self.enabled or not index_path.exists() or not meta_path.exists():
+            return
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("index_type") != self.index_type or meta.get("dimension") != self.dimension:
+                logger.info(f"Ignoring persisted {meta.get('index_type')} index, configured type is {self.index_type}")
+                return
+
+            loop = asyncio.get_running_loop()
+            index = await loop.run_in_executor(None, faiss.read_index, str(index_path))
+            if index.ntotal > exact_index.ntotal:
+                logger.warning(f"Persisted {self.index_type} index is ahead of the exact index, rebuilding it")
+                return
+
+            self._apply_search_param(index, meta.get("search_param") or {})
+            while index.ntotal < exact_index.ntotal:
+                await loop.run_in_executor(None, self._catch_up, index, exact_index.view)
+
+            self.index = index
+            self.built_size = meta.get("built_size", index.ntotal)
+            self.attempted_size = self.built_size
+            self.search_param = meta.get("search_param")
+            self.last_recall = meta.get("recall_at_k")
+            self.loaded_from_disk = True
+            logger.info(
+                f"Loaded {self.index_type} index with {index.ntotal} vectors from {index_path.name} "
+                f"(recall@{meta.get('recall_k', self.recall_k)}={self.last_recall})"
+            )
+        except Exception as e:
+            logger.warning(f"Error loading persisted {self.index_type} index: {e}, rebuilding it")
+            self.reset()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-ann")
+        return self._executor
+
+    def _append(self, index, vectors: np.ndarray, start_row: int) -> bool:
+        with self._lock.writing():
+            covered = index.ntotal - start_row
+            if covered < 0:
+                return False
+            if covered < len(vectors):
+                index.add(vectors[covered:])
+        return True
+
+    def maybe_schedule(self, exact_index):
+        if not self.enabled or self.building:
+            return
+
+        size = exact_index.ntotal
+        if size < self.promotion_threshold:
+            return
+        if self.attempted_size and size < self.attempted_size * self.rebuild_growth:
+            return
+
+        self.attempted_size = size
+        self._task = asyncio.create_task(self._promote(exact_index))
+
+    async def _promote(self, exact_index):
+        loop = asyncio.get_running_loop()
+        view = exact_index.view
+        size = view.ntotal
+        epoch = self._epoch
+        try:
+            started = time.perf_counter()
+            index, search_param, recall = await loop.run_in_executor(None, self._build, view)
+            build_seconds = time.perf_counter() - started
+
+            self.last_recall = recall
+            self.last_build_seconds = build_seconds
+            if index is None:
+                self.rejected_builds += 1
+                logger.warning(
+                    f"{self.index_type} index rejected at {size} vectors: recall@{self.recall_k}={recall:.3f} "
+                    f"is below {self.min_recall}, staying on exact search"
+                )
+                return
+            if epoch != self._epoch:
+                return
+
+
+            while index.ntotal < exact_index.ntotal:
+                await loop.run_in_executor(None, self._catch_up, index, exact_index.view)
+                if epoch != self._epoch:
+                    return
+
+            current = index.ntotal
+            self.index = index
+            self.built_size = current
+            self.search_param = search_param
+            self.builds += 1
+            logger.info(
+                f"Promoted vector index to {self.index_type} at {current} vectors "
+                f"(recall@{self.recall_k}={recall:.3f}, {search_param}, {build_seconds:.1f}s)"
+            )
+        except Exception as e:
+            logger.error(f"Error building {self.index_type} index: {e}", exc_info=True)
+
+    def _catch_up(self, index, view):
+        index.add(view.reconstruct_n(index.ntotal, view.ntotal - index.ntotal))
+
+    def _build(self, view) -> Tuple[Optional[Any], Optional[Dict[str, int]], float]:
+        vectors = view.reconstruct_n(0, view.ntotal)
+        count = vectors.shape[0]
+        index = self._create_index(count)
+
+        if not index.is_trained:
+            rng = np.random.default_rng(0)
+            train_size = min(count, max(256 * self._nlist(count), 10000))
+            train_rows = rng.choice(count, size=train_size, replace=False) if train_size < count else np.arange(count)
+            index.train(vectors[train_rows])
+        index.add(vectors)
+
+
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(count, size=min(count, 256), replace=False)]
+        queries = queries + rng.normal(
+            scale=settings.vector_ann_recall_noise / math.sqrt(self.dimension), size=queries.shape
+        ).astype(np.float32)
+        faiss.normalize_L2(queries)
+        _, truth = faiss.knn(queries, vectors, self.recall_k, metric=faiss.METRIC_INNER_PRODUCT)
+
+        recall = 0.0
+        for search_param in self._search_params(count):
+            self._apply_search_param(index, search_param)
+            if self.reranked:
+                _, found = index.search(queries, self.recall_k * self.rerank_factor)
+                _, found = rerank(queries, found, lambda rows: vectors[rows], self.recall_k)
+            else:
+                _, found = index.search(queries, self.recall_k)
+            recall = float(np.mean([
+                len(set(truth_row) & set(found_row)) / self.recall_k
+                for truth_row, found_row in zip(truth, found)
+            ]))
+            if recall >= self.min_recall:
+                return index, search_param, recall
+
+        return None, None, recall
+
+    def _nlist(self, count: int) -> int:
+        return max(1, min(65536, int(4 * math.sqrt(count)), count // 39))
+
+    def _create_index(self, count: int):
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimension, settings.vector_ann_hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = settings.vector_ann_hnsw_ef_construction
+            return index
+
+        if self.index_type == "sq8":
+            return faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "fp16":
+            return faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "pq":
+            return faiss.IndexPQ(self.dimension, self._pq_m(), 8, faiss.METRIC_INNER_PRODUCT)
+
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        if self.index_type == "ivf_pq":
+            return faiss.IndexIVFPQ(quantizer, self.dimension, self._nlist(count), self._pq_m(), 8, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexIVFFlat(quantizer, self.dimension, self._nlist(count), faiss.METRIC_INNER_PRODUCT)
+
+    def _pq_m(self) -> int:
+        pq_m = settings.vector_ann_pq_m
+        while self.dimension % pq_m:
+            pq_m -= 1
+        return pq_m
+
+    def _search_params(self, count: int):
+        if self.index_type in ("sq8", "fp16", "pq"):
+            yield {}
+        elif self.index_type == "hnsw":
+            ef_search = settings.vector_ann_hnsw_ef_search
+            while ef_search <= 1024:
+                yield {"efSearch": ef_search}
+                ef_search *= 2
+        else:
+            nlist = self._nlist(count)
+            nprobe = min(settings.vector_ann_nprobe, nlist)
+            while True:
+                yield {"nprobe": nprobe}
+                if nprobe >= nlist:
+                    break
+                nprobe = min(nprobe * 2, nlist)
+
+    def _apply_search_param(self, index, search_param: Dict[str, int]):
+        if "efSearch" in search_param:
+            index.hnsw.efSearch = search_param["efSearch"]
+        elif "nprobe" in search_param:
+            index.nprobe = search_param["nprobe"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "index_type": self.index_type if self.index is not None else "flat",
+            "configured_ann_type": self.index_type,
+            "promotion_threshold": self.promotion_threshold,
+            "ann_vectors": self.index.ntotal if self.index is not None else 0,
+            "code_bytes_per_vector": getattr(self.index, "code_size", None) if self.index is not None else None,
+            "code_bytes": getattr(self.index, "code_size", 0) * self.index.ntotal if self.index is not None else 0,
+            "float32_bytes_per_vector": self.dimension * 4,
+            "loaded_from_disk": self.loaded_from_disk,
+            "rerank_factor": self.rerank_factor if self.reranked else None,
+            "built_size": self.built_size,
+            "building": self.building,
+            "search_param": self.search_param,
+            "recall_at_k": self.last_recall,
+            "recall_k": self.recall_k,
+            "min_recall": self.min_recall,
+            "last_build_seconds": self.last_build_seconds,
+            "builds": self.builds,
+            "rejected_builds": self.rejected_builds
+        }
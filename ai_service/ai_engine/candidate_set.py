@@ -0,0 +1,115 @@
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    top_k = min(top_k, scores.shape[0])
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if top_k < scores.shape[0]:
+        indices = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        indices = np.arange(scores.shape[0])
+    return indices[np.argsort(-scores[indices], kind="stable")]
+
+
+def normalize_rows(matrix: np.ndarray, dtype=np.float32) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.ascontiguousarray(matrix / np.clip(norms, 1e-12, None), dtype=dtype)
+
+
+class CandidateSet:
+
+    def __init__(self, texts: Sequence[str], labels: Optional[Sequence[Any]] = None, dtype: str = "float32"):
+        self.texts = list(texts)
+        self.labels = list(labels) if labels is not None else None
+        self.dtype = np.dtype(dtype)
+        self.matrix = None
+        self.version = 0
+        self._label_indices = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def is_built(self) -> bool:
+        return self.matrix is not None
+
+    def invalidate(self):
+        self.matrix = None
+        self._label_indices = {}
+        self.version += 1
+
+    def update(self, texts: Sequence[str], labels: Optional[Sequence[Any]] = None) -> bool:
+        texts = list(texts)
+        labels = list(labels) if labels is not None else None
+        if texts == self.texts and labels == self.labels:
+            return False
+
+        self.texts = texts
+        self.labels = labels
+        self.invalidate()
+        return True
+
+    async def build(self, embedding_model) -> "CandidateSet":
+        if self.texts:
+            self.matrix = normalize_rows(await embedding_model.encode(self.texts), self.dtype)
+        else:
+            self.matrix = np.zeros((0, embedding_model.get_embedding_dimension()), dtype=self.dtype)
+
+        if self.labels is not None:
+            grouped = {}
+            for idx, label in enumerate(self.labels):
+                grouped.setdefault(label, []).append(idx)
+            self._label_indices = {label: np.array(indices) for label, indices in grouped.items()}
+        return self
+
+    async def ensure_built(self, embedding_model) -> "CandidateSet":
+        if self.matrix is None:
+            await self.build(embedding_model)
+        return self
+
+    def scores(self, query_embeddings: np.ndarray) -> np.ndarray:
+        queries = normalize_rows(query_embeddings, self.dtype)
+        return np.dot(queries, self.matrix.T).astype(np.float32)
+
+    def top_k(self, query_embedding: np.ndarray, top_k: int = 5, threshold: float = -1.0) -> List[Tuple[str, float]]:
+        if not self.texts:
+            return []
+
+        scores = self.scores(query_embedding)[0]
+        return [
+            (self.texts[idx], float(scores[idx]))
+            for idx in top_k_indices(scores, top_k)
+            if scores[idx] >= threshold
+        ]
+
+    def top_k_many(self, query_embeddings: np.ndarray, top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        if not self.texts:
+            return [[] for _ in range(len(query_embeddings))]
+
+        all_scores = self.scores(query_embeddings)
+        return [
+            [(self.texts[idx], float(scores[idx])) for idx in top_k_indices(scores, top_k)]
+            for scores in all_scores
+        ]
+
+    def top_k_by_label(self, query_embedding: np.ndarray, top_k: int = 3, threshold: float = -1.0) -> Dict[Any, List[Tuple[str, float]]]:
+        if not self.texts or self.labels is None:
+            return {}
+
+        scores = self.scores(query_embedding)[0]
+        results = {}
+        for label, indices in self._label_indices.items():
+            label_scores = scores[indices]
+            matches = [
+                (self.texts[indices[idx]], float(label_scores[idx]))
+                for idx in top_k_indices(label_scores, top_k)
+                if label_scores[idx] >= threshold
+            ]
+            if matches:
+                results[label] = matches
+        return results
@@ -219,17 +219,23 @@ class ContinuousLearner:
         entities: Dict[str, Any]
     ):
 
-        for source in data_sources:
-            await self.vector_store.add(
-                text=f"{intent} using {source}",
-                metadata={
+        if not data_sources:
+            return
+
+        learned_at = datetime.utcnow().isoformat()
+        await self.vector_store.add_many(
+            [f"{intent} using {source}" for source in data_sources],
+            [
+                {
                     "type": "data_source_pattern",
                     "intent": intent,
                     "data_source": source,
                     "entities": json.dumps(entities),
-                    "learned_at": datetime.utcnow().isoformat()
+                    "learned_at": learned_at
                 }
-            )
+                for source in data_sources
+            ]
+        )
 
     async def batch_learn(
         self,
@@ -0,0 +1,374 @@
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import re
+import threading
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+ENTRY_OVERHEAD_BYTES = 96
+
+
+def cache_directory_name(model_name: str) -> str:
+    readable = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_")[:64]
+    digest = hashlib.blake2b(model_name.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{readable}-{digest}"
+
+
+def normalize_text_key(text: str) -> str:
+    return text.lower().strip()
+
+
+def text_key_hash(text: str) -> bytes:
+    return hashlib.blake2b(normalize_text_key(text).encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: Optional[float] = None,
+        dtype: str = "float16",
+        initial_slots: int = 1024
+    ):
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self.dtype = np.dtype(dtype)
+        self.initial_slots = max(1, initial_slots)
+        self.dimension = None
+
+
+        self._arena = None
+        self._expires = None
+        self._slots = OrderedDict()
+        self._free = []
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def entry_bytes(self) -> int:
+        if self.dimension is None:
+            return 0
+        return self.dimension * self.dtype.itemsize + ENTRY_OVERHEAD_BYTES
+
+    @property
+    def max_entries(self) -> int:
+        if self.dimension is None:
+            return 0
+        return self.max_bytes // self.entry_bytes
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, text: str) -> bool:
+        return text_key_hash(text) in self._slots
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = text_key_hash(text)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+
+            if self.ttl_seconds is not None and self._expires[slot] < time.monotonic():
+                self._release(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return self._arena[slot].astype(np.float32)
+
+    def put(self, text: str, embedding: np.ndarray):
+        if self.max_bytes == 0:
+            return
+
+        vector = np.asarray(embedding).reshape(-1)
+        key = text_key_hash(text)
+
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = vector.shape[0]
+                if self.max_entries == 0:
+                    logger.warning(f"Embedding cache budget of {self.max_bytes} bytes is too small for one entry")
+            elif vector.shape[0] != self.dimension:
+                logger.warning(f"Embedding dimension changed from {self.dimension} to {vector.shape[0]}, clearing cache")
+                self._reset(vector.shape[0])
+
+            if self.max_entries == 0:
+                return
+
+            slot = self._slots.get(key)
+            if slot is None:
+                while len(self._slots) >= self.max_entries:
+                    self._evict_oldest()
+                slot = self._allocate_slot()
+                self._slots[key] = slot
+            else:
+                self._slots.move_to_end(key)
+
+            self._arena[slot] = vector.astype(self.dtype)
+            if self.ttl_seconds is not None:
+                self._expires[slot] = time.monotonic() + self.ttl_seconds
+
+    def clear(self):
+        with self._lock:
+            self._reset(self.dimension)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._slots),
+            "max_entries": self.max_entries,
+            "bytes_used": len(self._slots) * self.entry_bytes,
+            "arena_bytes": self._arena.nbytes if self._arena is not None else 0,
+            "max_bytes": self.max_bytes,
+            "dtype": self.dtype.name,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _allocate_slot(self) -> int:
+        if self._free:
+            return self._free.pop()
+
+        if self._arena is None or self._next_slot >= self._arena.shape[0]:
+            self._grow()
+
+        slot = self._next_slot
+        self._next_slot += 1
+        return slot
+
+    def _grow(self):
+        current = self._arena.shape[0] if self._arena is not None else 0
+        capacity = min(self.max_entries, max(self.initial_slots, current * 2))
+
+        arena = np.zeros((capacity, self.dimension), dtype=self.dtype)
+        expires = np.zeros(capacity, dtype=np.float64)
+        if self._arena is not None:
+            arena[:current] = self._arena
+            expires[:current] = self._expires
+
+        self._arena = arena
+        self._expires = expires
+
+    def _evict_oldest(self):
+        key, _ = next(iter(self._slots.items()))
+        self._release(key)
+        self.evictions += 1
+
+    def _release(self, key: bytes):
+        slot = self._slots.pop(key)
+        self._free.append(slot)
+
+    def _reset(self, dimension: Optional[int]):
+        self.dimension = dimension
+        self._arena = None
+        self._expires = None
+        self._slots.clear()
+        self._free = []
+        self._next_slot = 0
+
+
+class PersistentEmbeddingCache:
+
+    KEY_BYTES = 16
+
+    def __init__(
+        self,
+        storage_path: str,
+        model_name: str,
+        max_entries: int = 500000,
+        dtype: str = "float16"
+    ):
+        self.storage_path = Path(storage_path)
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self.dimension = None
+        self.ready = False
+
+        self._set_paths()
+
+
+        self._rows = {}
+        self._loaded_rows = 0
+        self._vectors = None
+        self._lock = threading.Lock()
+        self._full_warned = False
+
+        self.hits = 0
+        self.misses = 0
+        self.appended = 0
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    def open(self, dimension: int):
+        self.dimension = dimension
+        self._set_paths()
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+
+        with self._file_lock():
+            meta = self._read_meta()
+            expected = {"model_name": self.model_name, "dimension": dimension, "dtype": self.dtype.name}
+            if meta != expected or not self.keys_path.exists() or not self.vectors_path.exists():
+                if meta and meta != expected:
+                    logger.info(f"Persistent embedding cache {self.cache_path.name} does not match {expected}, resetting it")
+                self.keys_path.write_bytes(b"")
+                self.vectors_path.write_bytes(b"")
+                with open(self.meta_path, "w") as f:
+                    json.dump(expected, f)
+
+        self._refresh()
+        self.ready = True
+        logger.info(f"Persistent embedding cache {self.cache_path.name} opened with {len(self._rows)} entries")
+
+    def key_for(self, text: str) -> bytes:
+        payload = f"{self.model_name}\0{normalize_text_key(text)}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=self.KEY_BYTES).digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        if not self.ready:
+            return [None] * len(texts)
+
+        keys = [self.key_for(text) for text in texts]
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+
+            results = []
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(self._vectors[row])
+            return results
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        if not self.ready or not texts:
+            return
+
+        pending = {}
+        for text, embedding in zip(texts, embeddings):
+            key = self.key_for(text)
+            if key not in self._rows:
+                pending[key] = embedding
+        if not pending:
+            return
+
+        try:
+            with self._lock, self._file_lock():
+                start_row = self.keys_path.stat().st_size // self.KEY_BYTES
+                room = self.max_entries - start_row
+                if room <= 0:
+                    if not self._full_warned:
+                        logger.warning(f"Persistent embedding cache is full ({self.max_entries} entries), not storing new embeddings")
+                        self._full_warned = True
+                    return
+
+                items = list(pending.items())[:room]
+                matrix = np.asarray([embedding for _, embedding in items], dtype=self.dtype).reshape(len(items), self.dimension)
+
+
+                with open(self.vectors_path, "r+b") as f:
+                    f.seek(start_row * self.row_bytes)
+                    f.write(matrix.tobytes())
+                with open(self.keys_path, "ab") as f:
+                    f.write(b"".join(key for key, _ in items))
+
+                self.appended += len(items)
+                self._refresh()
+        except Exception as e:
+            logger.error(f"Error writing persistent embedding cache: {e}", exc_info=True)
+
+    def close(self):
+        with self._lock:
+            self._vectors = None
+            self.ready = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._rows),
+            "max_entries": self.max_entries,
+            "file_bytes": len(self._rows) * self.row_bytes if self.dimension else 0,
+            "model_name": self.model_name,
+            "path": str(self.cache_path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "appended": self.appended,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _set_paths(self):
+        self.cache_path = self.storage_path / cache_directory_name(f"{self.model_name}:{self.dtype.name}")
+        self.keys_path = self.cache_path / "keys.bin"
+        self.vectors_path = self.cache_path / "vectors.bin"
+        self.meta_path = self.cache_path / "meta.json"
+        self.lock_path = self.cache_path / "write.lock"
+
+    def _refresh(self):
+        total_rows = self.keys_path.stat().st_size // self.KEY_BYTES
+        if total_rows == self._loaded_rows and self._vectors is not None:
+            return
+
+
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._loaded_rows * self.KEY_BYTES)
+            data = f.read((total_rows - self._loaded_rows) * self.KEY_BYTES)
+        for offset in range(0, len(data), self.KEY_BYTES):
+            self._rows.setdefault(data[offset:offset + self.KEY_BYTES], self._loaded_rows + offset // self.KEY_BYTES)
+        self._loaded_rows = total_rows
+
+        if total_rows == 0:
+            self._vectors = np.zeros((0, self.dimension), dtype=self.dtype)
+        else:
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(total_rows, self.dimension))
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -1,10 +1,15 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
+from collections import OrderedDict
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import torch
 from datetime import datetime
 import asyncio
+import time
 
+from ai_engine.candidate_set import CandidateSet
+from ai_engine.embedding_cache import EmbeddingCache, PersistentEmbeddingCache
+from ai_engine.encoder_service import MicroBatchingEncoder
 from config import settings
 from utils.logger import setup_logger
 
@@ -13,65 +18,150 @@ logger = setup_logger(__name__)
 
 class AdvancedEmbeddingModel:
 
+    MAX_CANDIDATE_SETS = 64
+
     def __init__(self):
         self.model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.ready = False
-        self.embedding_cache = {}
+        self.embedding_cache = EmbeddingCache(
+            max_bytes=settings.embedding_cache_max_bytes,
+            ttl_seconds=settings.embedding_cache_ttl,
+            dtype=settings.embedding_cache_dtype
+        )
         self.model_name = settings.embedding_model
+        self.backend = "torch"
+        self.candidate_sets = OrderedDict()
+        self.bucketing_stats = {
+            "texts": 0,
+            "real_tokens": 0,
+            "padded_tokens": 0,
+            "unbucketed_padded_tokens": 0,
+            "seconds": 0.0
+        }
+        self.onnx_backend = None
+        self.disk_cache = None
+        if settings.embedding_disk_cache_enabled:
+            self.disk_cache = PersistentEmbeddingCache(
+                storage_path=settings.embedding_disk_cache_path,
+                model_name=self.model_name,
+                max_entries=settings.embedding_disk_cache_max_entries
+            )
+        self.encoder = MicroBatchingEncoder(
+            self._encode_batch,
+            max_wait_ms=settings.encoder_batch_wait_ms,
+            max_batch_texts=settings.encoder_max_batch_texts
+        )
 
     async def initialize(self):
         logger.info(f"Loading embedding model: {self.model_name}")
         try:
 
-            self.model = SentenceTransformer(self.model_name, device=self.device)
+            loop = asyncio.get_running_loop()
+            self.model = await loop.run_in_executor(None, lambda: SentenceTransformer(self.model_name, device=self.device))
             self.ready = True
-            logger.info(f"[OK] Embedding model loaded on {self.device}")
+
+            if settings.embedding_backend == "onnx":
+                await loop.run_in_executor(None, self._initialize_onnx_backend)
+
+            if self.disk_cache:
+                try:
+                    self.disk_cache.model_name = f"{self.model_name}:{self.backend}"
+                    self.disk_cache.open(self.get_embedding_dimension())
+                except Exception as e:
+                    logger.warning(f"Persistent embedding cache unavailable: {e}")
+                    self.disk_cache = None
+            logger.info(f"[OK] Embedding model loaded on {self.device} ({self.backend} backend)")
         except Exception as e:
             logger.error(f"[ERROR] Error loading embedding model: {e}", exc_info=True)
             raise
 
+    def _initialize_onnx_backend(self):
+        try:
+            from ai_engine.onnx_embedding_backend import OnnxEmbeddingBackend
+
+            backend = OnnxEmbeddingBackend(
+                self.model,
+                self.model_name,
+                export_dir=settings.embedding_onnx_path,
+                quantize=settings.embedding_onnx_quantize
+            )
+            backend.prepare()
+
+            agreement = backend.check_parity(self._encode_torch)
+            if agreement < settings.embedding_onnx_min_cosine:
+                logger.warning(
+                    f"ONNX backend cosine agreement {agreement:.4f} is below "
+                    f"{settings.embedding_onnx_min_cosine}, staying on PyTorch"
+                )
+                return
+
+            self.onnx_backend = backend
+            self.backend = "onnx-int8" if settings.embedding_onnx_quantize else "onnx"
+            logger.info(f"[OK] ONNX backend enabled (min cosine agreement {agreement:.4f})")
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable, staying on PyTorch: {e}")
+
     async def cleanup(self):
+        await self.encoder.close()
+        if self.disk_cache:
+            self.disk_cache.close()
         self.model = None
         self.ready = False
 
     def is_ready(self) -> bool:
         return self.ready and self.model is not None
 
-    async def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    async def encode(self, texts: List[str], batch_size: int = 32, max_seq_length: Optional[int] = None) -> np.ndarray:
         if not self.is_ready():
             raise RuntimeError("Embedding model not initialized")
 
 
+        if max_seq_length:
+            cache_keys = [f"{text}\0{max_seq_length}" for text in texts]
+        else:
+            cache_keys = texts
+
         uncached_texts = []
         uncached_indices = []
         embeddings = [None] * len(texts)
 
         for i, text in enumerate(texts):
-            text_key = text.lower().strip()
-            if text_key in self.embedding_cache:
-                embeddings[i] = self.embedding_cache[text_key]
+            cached = self.embedding_cache.get(cache_keys[i])
+            if cached is not None:
+                embeddings[i] = cached
             else:
                 uncached_texts.append(text)
                 uncached_indices.append(i)
 
 
+        if uncached_texts and self.disk_cache:
+            disk_hits = self.disk_cache.get_many([cache_keys[idx] for idx in uncached_indices])
+            still_uncached_texts = []
+            still_uncached_indices = []
+            for text, idx, cached in zip(uncached_texts, uncached_indices, disk_hits):
+                if cached is not None:
+                    embeddings[idx] = cached.astype(np.float32)
+                    self.embedding_cache.put(cache_keys[idx], cached)
+                else:
+                    still_uncached_texts.append(text)
+                    still_uncached_indices.append(idx)
+            uncached_texts = still_uncached_texts
+            uncached_indices = still_uncached_indices
+
+
         if uncached_texts:
             try:
-                new_embeddings = self.model.encode(
-                    uncached_texts,
-                    batch_size=batch_size,
-                    show_progress_bar=False,
-                    convert_to_numpy=True,
-                    normalize_embeddings=True
-                )
+                new_embeddings = await self.encoder.encode(uncached_texts, batch_size=batch_size, max_seq_length=max_seq_length)
 
 
-                for idx, text in enumerate(uncached_texts):
-                    text_key = text.lower().strip()
+                for idx, original_idx in enumerate(uncached_indices):
                     embedding = new_embeddings[idx]
-                    self.embedding_cache[text_key] = embedding
-                    embeddings[uncached_indices[idx]] = embedding
+                    self.embedding_cache.put(cache_keys[original_idx], embedding)
+                    embeddings[original_idx] = embedding
+
+                if self.disk_cache:
+                    self.disk_cache.put_many([cache_keys[idx] for idx in uncached_indices], new_embeddings)
 
             except Exception as e:
                 logger.error(f"Error encoding texts: {e}", exc_info=True)
@@ -81,6 +171,87 @@ class AdvancedEmbeddingModel:
 
         return np.array([emb for emb in embeddings if emb is not None])
 
+    def _encode_batch(self, texts: List[str], batch_size: int, max_seq_length: Optional[int] = None) -> np.ndarray:
+        max_length = max_seq_length or self.model.max_seq_length
+        token_lengths = self._token_lengths(texts, max_length)
+        order = np.argsort(token_lengths, kind="stable")
+
+        started = time.perf_counter()
+        embeddings = None
+        padded_tokens = 0
+        for bucket in self._length_buckets(order, token_lengths, batch_size):
+            bucket_texts = [texts[i] for i in bucket]
+            if self.onnx_backend:
+                bucket_embeddings = self.onnx_backend.encode(bucket_texts, len(bucket), max_seq_length=max_length)
+            else:
+                bucket_embeddings = self._encode_torch(bucket_texts, len(bucket), max_seq_length=max_length)
+
+            if embeddings is None:
+                embeddings = np.zeros((len(texts), bucket_embeddings.shape[1]), dtype=np.float32)
+            embeddings[bucket] = bucket_embeddings
+            padded_tokens += len(bucket) * int(token_lengths[bucket].max())
+        elapsed = time.perf_counter() - started
+
+
+        unbucketed_padded_tokens = sum(
+            len(token_lengths[start:start + batch_size]) * int(token_lengths[start:start + batch_size].max())
+            for start in range(0, len(texts), batch_size)
+        )
+        stats = self.bucketing_stats
+        stats["texts"] += len(texts)
+        stats["real_tokens"] += int(token_lengths.sum())
+        stats["padded_tokens"] += padded_tokens
+        stats["unbucketed_padded_tokens"] += unbucketed_padded_tokens
+        stats["seconds"] += elapsed
+
+        return embeddings
+
+    def _encode_torch(self, texts: List[str], batch_size: int, max_seq_length: Optional[int] = None) -> np.ndarray:
+        default_max_length = self.model.max_seq_length
+        if max_seq_length:
+            self.model.max_seq_length = max_seq_length
+        try:
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        finally:
+            self.model.max_seq_length = default_max_length
+
+    def _token_lengths(self, texts: List[str], max_length: int) -> np.ndarray:
+        try:
+            input_ids = self.model.tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)["input_ids"]
+            return np.array([len(ids) for ids in input_ids], dtype=np.int64)
+        except Exception:
+            return np.array([min(max_length, len(text) // 4 + 2) for text in texts], dtype=np.int64)
+
+    def _length_buckets(self, order: np.ndarray, token_lengths: np.ndarray, batch_size: int) -> List[np.ndarray]:
+        buckets = []
+        current = []
+        bucket_limit = 0
+        for idx in order:
+            length = int(token_lengths[idx])
+            if current and (len(current) >= batch_size or length > bucket_limit):
+                buckets.append(np.array(current))
+                current = []
+            if not current:
+                bucket_limit = 1 << max(3, (length - 1).bit_length())
+            current.append(idx)
+        if current:
+            buckets.append(np.array(current))
+        return buckets
+
+    async def similarities(self, query: str, candidates: List[str], max_seq_length: Optional[int] = None) -> np.ndarray:
+        if not candidates:
+            return np.zeros(0, dtype=np.float32)
+
+        query_embedding = await self.encode([query])
+        candidate_embeddings = await self.encode(candidates, max_seq_length=max_seq_length)
+        return np.dot(candidate_embeddings, query_embedding[0])
+
     async def similarity(self, text1: str, text2: str) -> float:
         embeddings = await self.encode([text1, text2])
         if len(embeddings) < 2:
@@ -90,58 +261,67 @@ class AdvancedEmbeddingModel:
         dot_product = np.dot(embeddings[0], embeddings[1])
         return float(dot_product)
 
+    async def get_candidate_set(self, candidates: Union[List[str], CandidateSet]) -> CandidateSet:
+        if isinstance(candidates, CandidateSet):
+            return await candidates.ensure_built(self)
+
+        key = tuple(candidates)
+        candidate_set = self.candidate_sets.get(key)
+        if candidate_set is None:
+            candidate_set = await CandidateSet(candidates).build(self)
+            self.candidate_sets[key] = candidate_set
+            while len(self.candidate_sets) > self.MAX_CANDIDATE_SETS:
+                self.candidate_sets.popitem(last=False)
+        else:
+            self.candidate_sets.move_to_end(key)
+        return candidate_set
+
     async def find_most_similar(
         self,
         query: str,
-        candidates: List[str],
+        candidates: Union[List[str], CandidateSet],
         top_k: int = 5,
         threshold: float = 0.5
     ) -> List[Tuple[str, float]]:
-        if not candidates:
+        if not len(candidates):
             return []
 
         query_embedding = await self.encode([query])
         if len(query_embedding) == 0:
             return []
 
-        candidate_embeddings = await self.encode(candidates)
-
-
-        similarities = np.dot(candidate_embeddings, query_embedding[0])
-
-
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-
-        results = []
-        for idx in top_indices:
-            score = float(similarities[idx])
-            if score >= threshold:
-                results.append((candidates[idx], score))
-
-        return results
+        candidate_set = await self.get_candidate_set(candidates)
+        return candidate_set.top_k(query_embedding, top_k=top_k, threshold=threshold)
 
     async def batch_similarity(
         self,
         queries: List[str],
-        candidates: List[str],
+        candidates: Union[List[str], CandidateSet],
         top_k: int = 5
     ) -> List[List[Tuple[str, float]]]:
-        query_embeddings = await self.encode(queries)
-        candidate_embeddings = await self.encode(candidates)
-
-
-        similarities = np.dot(candidate_embeddings, query_embeddings.T)
-
-        results = []
-        for i, query in enumerate(queries):
-            query_sims = similarities[:, i]
-            top_indices = np.argsort(query_sims)[::-1][:top_k]
-            results.append([
-                (candidates[idx], float(query_sims[idx]))
-                for idx in top_indices
-            ])
+        if not queries:
+            return []
 
-        return results
+        query_embeddings = await self.encode(queries)
+        candidate_set = await self.get_candidate_set(candidates)
+        return candidate_set.top_k_many(query_embeddings, top_k=top_k)
+
+    def get_stats(self) -> Dict[str, Any]:
+        bucketing = dict(self.bucketing_stats)
+        bucketing["padding_efficiency"] = bucketing["real_tokens"] / bucketing["padded_tokens"] if bucketing["padded_tokens"] else 1.0
+        bucketing["unbucketed_padding_efficiency"] = (
+            bucketing["real_tokens"] / bucketing["unbucketed_padded_tokens"]
+            if bucketing["unbucketed_padded_tokens"] else 1.0
+        )
+        bucketing["tokens_per_second"] = bucketing["real_tokens"] / bucketing["seconds"] if bucketing["seconds"] else 0.0
+
+        return {
+            "backend": self.backend,
+            "cache": self.embedding_cache.get_stats(),
+            "disk_cache": self.disk_cache.get_stats() if self.disk_cache else None,
+            "encoder": self.encoder.get_stats(),
+            "length_bucketing": bucketing
+        }
 
     def get_embedding_dimension(self) -> int:
         if self.model:
@@ -0,0 +1,145 @@
+from typing import Dict, Any, List, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MicroBatchingEncoder:
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str], int, Optional[int]], np.ndarray],
+        max_wait_ms: float = 5.0,
+        max_batch_texts: int = 128
+    ):
+        self.encode_fn = encode_fn
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_batch_texts = max(1, max_batch_texts)
+
+
+        self._executor = None
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+        self.requests = 0
+        self.batches = 0
+        self.texts_encoded = 0
+        self.largest_batch = 0
+        self.busy_seconds = 0.0
+
+    async def encode(self, texts: List[str], batch_size: int = 32, max_seq_length: Optional[int] = None) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        self.requests += 1
+        await self._queue.put((texts, batch_size, max_seq_length, future))
+        return await future
+
+    async def close(self):
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._queue = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts_encoded": self.texts_encoded,
+            "largest_batch": self.largest_batch,
+            "avg_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_texts": self.max_batch_texts
+        }
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop):
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-encoder")
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            pending_texts = len(batch[0][0])
+
+
+            deadline = loop.time() + self.max_wait
+            while pending_texts < self.max_batch_texts:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                pending_texts += len(item[0])
+
+            try:
+                await self._process(loop, batch)
+            except Exception as e:
+                logger.error(f"Error processing encoder batch: {e}", exc_info=True)
+                self._fail(batch, e)
+
+    async def _process(self, loop: asyncio.AbstractEventLoop, batch: List[tuple]):
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[2], []).append(item)
+
+        for max_seq_length, group in groups.items():
+            try:
+                await self._process_group(loop, group, max_seq_length)
+            except Exception as e:
+                logger.error(f"Error encoding batch of {len(group)} requests: {e}", exc_info=True)
+                self._fail(group, e)
+
+    def _fail(self, items: List[tuple], error: Exception):
+        for _, _, _, future in items:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _process_group(self, loop: asyncio.AbstractEventLoop, group: List[tuple], max_seq_length: Optional[int]):
+        unique_texts = {}
+        for texts, _, _, _ in group:
+            for text in texts:
+                unique_texts.setdefault(text, len(unique_texts))
+
+        merged_texts = list(unique_texts)
+        batch_size = max(size for _, size, _, _ in group)
+
+        started = time.perf_counter()
+        try:
+            embeddings = await loop.run_in_executor(self._executor, self.encode_fn, merged_texts, batch_size, max_seq_length)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+        self.batches += 1
+        self.texts_encoded += len(merged_texts)
+        self.largest_batch = max(self.largest_batch, len(merged_texts))
+
+        for texts, _, _, future in group:
+            if future.done():
+                continue
+            rows = [unique_texts[text] for text in texts]
+            future.set_result(embeddings[rows])
@@ -4,6 +4,7 @@ from datetime import datetime
 
 from ai_engine.embedding_model import AdvancedEmbeddingModel
 from ai_engine.vector_store import VectorStore
+from config import settings
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -164,6 +165,7 @@ class InformationUnderstandingEngine:
             content = self._remove_junk_patterns(content)
 
 
+        sentence_candidates = []
         if content:
             sentences = re.split(r'[.!?]+', content)
             for sentence in sentences:
@@ -176,35 +178,12 @@ class InformationUnderstandingEngine:
                 if self._is_junk_sentence(sentence):
                     continue
 
+                sentence_candidates.append(sentence)
 
-                try:
-                    similarity = await self.embedding_model.similarity(query, sentence)
-
-                    if similarity > 0.3:
-                        insights.append({
-                            "text": sentence,
-                            "type": "insight",
-                            "relevance": similarity,
-                            "source": "web_content"
-                        })
-                except Exception as e:
-                    logger.debug(f"Error calculating similarity: {e}")
-
-                    query_words = set(re.findall(r'\b[a-z]{4,}\b', query.lower()))
-                    sentence_lower = sentence.lower()
-                    keyword_matches = sum(1 for word in query_words if word in sentence_lower)
-                    has_market_keywords = any(kw in sentence_lower for kw in ['market', 'price', 'rent', 'property', 'real estate', 'housing', 'investment', 'growth', 'trend', 'yield', 'appreciation'])
-
-
-                    if keyword_matches >= 1 and self._is_well_formed_sentence(sentence):
-                        insights.append({
-                            "text": sentence,
-                            "type": "insight",
-                            "relevance": 0.5,
-                            "source": "web_content"
-                        })
+        insights.extend(await self._score_passages(query, sentence_candidates, "insight", "web_content"))
 
 
+        fact_candidates = []
         for fact in facts:
             fact = fact.strip()
             if len(fact) < 40 or len(fact) > 300:
@@ -214,37 +193,59 @@ class InformationUnderstandingEngine:
             if self._is_junk_sentence(fact):
                 continue
 
-            try:
-                similarity = await self.embedding_model.similarity(query, fact)
-                if similarity > 0.3:
-                    insights.append({
-                        "text": fact,
-                        "type": "fact",
-                        "relevance": similarity,
-                        "source": "web_facts"
-                    })
-            except Exception as e:
-                logger.debug(f"Error processing fact: {e}")
+            fact_candidates.append(fact)
 
-                query_words = set(re.findall(r'\b[a-z]{4,}\b', query.lower()))
-                fact_lower = fact.lower()
-                keyword_matches = sum(1 for word in query_words if word in fact_lower)
-                has_market_keywords = any(kw in fact_lower for kw in ['market', 'price', 'rent', 'property', 'real estate', 'housing', 'investment', 'growth', 'trend', 'yield', 'appreciation'])
+        insights.extend(await self._score_passages(query, fact_candidates, "fact", "web_facts"))
 
 
-                if keyword_matches >= 1 and self._is_well_formed_sentence(fact):
-                    insights.append({
-                        "text": fact,
-                        "type": "fact",
-                        "relevance": 0.5,
-                        "source": "web_facts"
+        insights.sort(key=lambda x: x.get("relevance", 0), reverse=True)
+
+
+        return insights[:10]
+
+    async def _score_passages(
+        self,
+        query: str,
+        passages: List[str],
+        passage_type: str,
+        source: str
+    ) -> List[Dict[str, Any]]:
+        if not passages:
+            return []
+
+        scored = []
+        try:
+            similarities = await self.embedding_model.similarities(
+                query,
+                passages,
+                max_seq_length=settings.embedding_passage_max_seq_length
+            )
+            for passage, similarity in zip(passages, similarities):
+                if similarity > 0.3:
+                    scored.append({
+                        "text": passage,
+                        "type": passage_type,
+                        "relevance": float(similarity),
+                        "source": source
                     })
+        except Exception as e:
+            logger.debug(f"Error calculating similarity: {e}")
 
+            query_words = set(re.findall(r'\b[a-z]{4,}\b', query.lower()))
+            for passage in passages:
+                passage_lower = passage.lower()
+                keyword_matches = sum(1 for word in query_words if word in passage_lower)
 
-        insights.sort(key=lambda x: x.get("relevance", 0), reverse=True)
 
+                if keyword_matches >= 1 and self._is_well_formed_sentence(passage):
+                    scored.append({
+                        "text": passage,
+                        "type": passage_type,
+                        "relevance": 0.5,
+                        "source": source
+                    })
 
-        return insights[:10]
+        return scored
 
     def _remove_junk_patterns(self, text: str) -> str:
         if not text:
@@ -0,0 +1,273 @@
+from typing import Optional, Tuple
+import copy
+import numpy as np
+
+from ai_engine.candidate_set import normalize_rows
+
+
+def _empty_results(num_queries: int, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        np.full((num_queries, top_k), -np.inf, dtype=np.float32),
+        np.full((num_queries, top_k), -1, dtype=np.int64)
+    )
+
+
+def _merge_top_k(
+    best_scores: np.ndarray,
+    best_ids: np.ndarray,
+    scores: np.ndarray,
+    column_ids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    top_k = best_scores.shape[1]
+    num_queries = scores.shape[0]
+
+    if scores.shape[1] > top_k:
+        local = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        local = np.broadcast_to(np.arange(scores.shape[1]), (num_queries, scores.shape[1]))
+    local_scores = np.take_along_axis(scores, local, axis=1)
+
+
+    merged_scores = np.concatenate([best_scores, local_scores], axis=1)
+    merged_ids = np.concatenate([best_ids, column_ids[local]], axis=1)
+    keep = np.argpartition(-merged_scores, top_k - 1, axis=1)[:, :top_k]
+    return np.take_along_axis(merged_scores, keep, axis=1), np.take_along_axis(merged_ids, keep, axis=1)
+
+
+def _finalize(best_scores: np.ndarray, best_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_ids = np.take_along_axis(best_ids, order, axis=1)
+    best_ids[~np.isfinite(best_scores)] = -1
+    return best_scores, best_ids
+
+
+def _grow(array: np.ndarray, required: int, fill: int = -1) -> np.ndarray:
+    if required <= len(array):
+        return array
+
+    capacity = max(1024, len(array))
+    while capacity < required:
+        capacity *= 2
+
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def subset_search(
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    ids: np.ndarray,
+    top_k: int,
+    chunk_rows: int = 65536
+) -> Tuple[np.ndarray, np.ndarray]:
+    top_k = max(1, top_k)
+    best_scores, best_ids = _empty_results(queries.shape[0], top_k)
+
+    for start in range(0, len(ids), chunk_rows):
+        chunk_ids = ids[start:start + chunk_rows]
+        scores = np.dot(queries, matrix[chunk_ids].T)
+        best_scores, best_ids = _merge_top_k(best_scores, best_ids, scores, chunk_ids)
+
+    return _finalize(best_scores, best_ids)
+
+
+class RowIdMap:
+
+    def __init__(self):
+        self.reset()
+
+    def __len__(self) -> int:
+        return self.live
+
+    def __contains__(self, vector_id: int) -> bool:
+        return 0 <= vector_id < self.next_id and self._positions[vector_id] >= 0
+
+    @property
+    def row_ids(self) -> np.ndarray:
+        return self._row_ids[:self.rows]
+
+    @property
+    def dead_rows(self) -> int:
+        return self.rows - self.live
+
+    def live_ids(self) -> np.ndarray:
+        row_ids = self.row_ids
+        return row_ids[row_ids >= 0]
+
+    def reserve(self, next_id: int):
+        if next_id > self.next_id:
+            self._positions = _grow(self._positions, next_id)
+            self.next_id = next_id
+
+    def append(self, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if len(ids) == 0:
+            return
+
+        self.reserve(int(ids.max()) + 1)
+        self._row_ids = _grow(self._row_ids, self.rows + len(ids))
+        self._row_ids[self.rows:self.rows + len(ids)] = ids
+        self._positions[ids] = np.arange(self.rows, self.rows + len(ids))
+        self.rows += len(ids)
+        self.live += len(ids)
+
+    def rows_for(self, ids: np.ndarray) -> np.ndarray:
+        return self._positions[np.asarray(ids, dtype=np.int64)]
+
+    def ids_at(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.rows == 0:
+            return np.full(rows.shape, -1, dtype=np.int64)
+        return np.where((rows >= 0) & (rows < self.rows), self._row_ids[np.clip(rows, 0, self.rows - 1)], -1)
+
+    def snapshot(self) -> "RowIdMap":
+        return copy.copy(self)
+
+    def remove(self, ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        ids = ids[(ids >= 0) & (ids < self.next_id)]
+        rows = self._positions[ids]
+        rows = np.unique(rows[rows >= 0])
+        if len(rows) == 0:
+            return rows
+
+
+        self._positions = self._positions.copy()
+        self._row_ids = self._row_ids.copy()
+        self._positions[self._row_ids[rows]] = -1
+        self._row_ids[rows] = -1
+        self.live -= len(rows)
+        return rows
+
+    def compact(self) -> np.ndarray:
+        keep = self.row_ids >= 0
+        row_ids = self.row_ids[keep]
+        next_id = self.next_id
+
+        self.reset()
+        self.reserve(next_id)
+        self.append(row_ids)
+        return keep
+
+    def reset(self):
+        self.rows = 0
+        self.live = 0
+        self.next_id = 0
+        self._row_ids = np.zeros(0, dtype=np.int64)
+        self._positions = np.zeros(0, dtype=np.int64)
+
+
+class MatrixView:
+
+    def __init__(self, matrix: np.ndarray, ids: RowIdMap, chunk_rows: int):
+        self.matrix = matrix
+        self.ids = ids
+        self.chunk_rows = chunk_rows
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self.ids
+
+    def get(self, vector_id: int) -> np.ndarray:
+        return self.matrix[self.ids.rows_for([vector_id])[0]]
+
+    def search(self, queries: np.ndarray, top_k: int, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize_rows(queries)
+        if ids is not None:
+            scores, rows = subset_search(self.matrix, queries, self.ids.rows_for(ids), top_k, self.chunk_rows)
+            return scores, self.ids.ids_at(rows)
+
+        top_k = max(1, top_k)
+        best_scores, best_ids = _empty_results(queries.shape[0], top_k)
+
+        for start in range(0, self.matrix.shape[0], self.chunk_rows):
+            stop = min(start + self.chunk_rows, self.matrix.shape[0])
+            scores = np.dot(queries, self.matrix[start:stop].T)
+            best_scores, best_ids = _merge_top_k(best_scores, best_ids, scores, np.arange(start, stop))
+
+        scores, rows = _finalize(best_scores, best_ids)
+        return scores, self.ids.ids_at(rows)
+
+
+class NumpyMatrixIndex:
+
+    def __init__(self, dimension: int, initial_capacity: int = 1024, chunk_rows: int = 65536):
+        self.dimension = dimension
+        self.initial_capacity = max(1, initial_capacity)
+        self.chunk_rows = max(1, chunk_rows)
+        self.ntotal = 0
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self.ids = RowIdMap()
+        self._publish()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self.ids
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self.ntotal]
+
+    @property
+    def capacity(self) -> int:
+        return self._matrix.shape[0]
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        vectors = normalize_rows(vectors)
+        count = vectors.shape[0]
+        self._reserve(self.ntotal + count)
+
+        if ids is None:
+            ids = np.arange(self.ids.next_id, self.ids.next_id + count)
+        self._matrix[self.ntotal:self.ntotal + count] = vectors
+        self.ids.append(ids)
+        self.ntotal += count
+        self._publish()
+        return np.asarray(ids, dtype=np.int64)
+
+    def get(self, vector_id: int) -> np.ndarray:
+        return self.view.get(vector_id)
+
+    def remove(self, ids: np.ndarray) -> int:
+        rows = self.ids.remove(ids)
+        if len(rows) == 0:
+            return 0
+
+
+        keep = self.ids.compact()
+        kept = self._matrix[:self.ntotal][keep]
+        self._matrix = np.zeros_like(self._matrix)
+        self._matrix[:len(kept)] = kept
+        self.ntotal = len(kept)
+        self._publish()
+        return len(rows)
+
+    def reset(self):
+        self.ntotal = 0
+        self._matrix = np.zeros((0, self.dimension), dtype=np.float32)
+        self.ids.reset()
+        self._publish()
+
+    def search(self, queries: np.ndarray, top_k: int, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.view.search(queries, top_k, ids)
+
+    def _publish(self):
+        self.view = MatrixView(self.matrix, self.ids.snapshot(), self.chunk_rows)
+
+    def _reserve(self, required: int):
+        if required <= self.capacity:
+            return
+
+        capacity = max(self.initial_capacity, self.capacity)
+        while capacity < required:
+            capacity *= 2
+
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        matrix[:self.ntotal] = self._matrix[:self.ntotal]
+        self._matrix = matrix
@@ -0,0 +1,134 @@
+from typing import Dict, Any, Optional, Iterable
+import numpy as np
+
+
+INDEXABLE_TYPES = (str, int, float, bool)
+EMPTY_IDS = np.empty(0, dtype=np.int64)
+EMPTY_IDS.flags.writeable = False
+
+
+class _Posting:
+
+    __slots__ = ("buffer", "size", "removed")
+
+    def __init__(self):
+        self.buffer = np.empty(16, dtype=np.int64)
+        self.size = 0
+        self.removed = set()
+
+    def __len__(self) -> int:
+        return self.size - len(self.removed)
+
+    def __contains__(self, vector_id: int) -> bool:
+        position = int(np.searchsorted(self.buffer[:self.size], vector_id))
+        return position < self.size and self.buffer[position] == vector_id and vector_id not in self.removed
+
+    def add(self, vector_id: int):
+        if vector_id in self.removed:
+            self.removed.discard(vector_id)
+            return
+
+        if self.size and vector_id <= self.buffer[self.size - 1]:
+            ids = self.buffer[:self.size]
+            position = int(np.searchsorted(ids, vector_id))
+            if ids[position] != vector_id:
+                self._replace(np.insert(ids, position, vector_id))
+            return
+
+        if self.size == len(self.buffer):
+            grown = np.empty(len(self.buffer) * 2, dtype=np.int64)
+            grown[:self.size] = self.buffer[:self.size]
+            self.buffer = grown
+
+
+        self.buffer[self.size] = vector_id
+        self.size += 1
+
+    def remove(self, vector_id: int):
+        if vector_id in self:
+            self.removed.add(vector_id)
+
+    def array(self) -> np.ndarray:
+        if self.removed:
+            ids = self.buffer[:self.size]
+            self._replace(ids[~np.isin(ids, np.fromiter(self.removed, dtype=np.int64, count=len(self.removed)))])
+            self.removed.clear()
+        return self.buffer[:self.size]
+
+    def _replace(self, ids: np.ndarray):
+        self.buffer = np.empty(max(16, len(ids) * 2), dtype=np.int64)
+        self.buffer[:len(ids)] = ids
+        self.size = len(ids)
+
+
+class MetadataIndex:
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = tuple(keys)
+        self._postings = {key: {} for key in self.keys}
+
+    def clear(self):
+        self._postings = {key: {} for key in self.keys}
+
+    def rebuild(self, entries: Iterable[Dict[str, Any]]):
+        self.clear()
+        for entry in entries:
+            self.add(entry["id"], entry)
+
+    def add(self, vector_id: int, entry: Dict[str, Any]):
+        for key in self.keys:
+            value = entry.get(key)
+            if isinstance(value, INDEXABLE_TYPES):
+                self._postings[key].setdefault(value, _Posting()).add(vector_id)
+
+    def remove(self, vector_id: int, entry: Dict[str, Any]):
+        for key in self.keys:
+            value = entry.get(key)
+            if not isinstance(value, INDEXABLE_TYPES):
+                continue
+            posting = self._postings[key].get(value)
+            if posting is None:
+                continue
+            posting.remove(vector_id)
+            if not len(posting):
+                del self._postings[key][value]
+
+    def update(self, vector_id: int, old_entry: Dict[str, Any], new_entry: Dict[str, Any]):
+        if any(old_entry.get(key) != new_entry.get(key) for key in self.keys):
+            self.remove(vector_id, old_entry)
+            self.add(vector_id, new_entry)
+
+    def ids_for(self, key: str, value: Any) -> np.ndarray:
+        posting = self._postings.get(key, {}).get(value) if isinstance(value, INDEXABLE_TYPES) else None
+        return EMPTY_IDS if posting is None else posting.array()
+
+    def newest(self, key: str, value: Any, limit: Optional[int] = None) -> np.ndarray:
+        ids = self.ids_for(key, value)
+        if limit is not None:
+            ids = ids[max(0, len(ids) - limit):]
+        return ids[::-1]
+
+    def count(self, key: str, value: Any) -> int:
+        return len(self._postings.get(key, {}).get(value, ()))
+
+    def values(self, key: str) -> Dict[Any, int]:
+        return {value: len(posting) for value, posting in self._postings.get(key, {}).items()}
+
+    def candidates(self, filter_metadata: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filter_metadata:
+            return None
+
+        indexed = [(key, value) for key, value in filter_metadata.items() if key in self._postings]
+        if not indexed:
+            return None
+
+        indexed.sort(key=lambda item: self.count(*item))
+        ids = self.ids_for(*indexed[0])
+        for key, value in indexed[1:]:
+            if len(ids) == 0:
+                break
+            ids = np.intersect1d(ids, self.ids_for(key, value), assume_unique=True)
+        return ids
+
+    def covers(self, filter_metadata: Optional[Dict[str, Any]]) -> bool:
+        return not filter_metadata or all(key in self._postings for key in filter_metadata)
@@ -0,0 +1,284 @@
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Sequence, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import json
+import re
+import sqlite3
+import numpy as np
+
+
+TYPED_COLUMNS = {
+    "text": str,
+    "timestamp": str,
+    "type": str,
+    "intent": str,
+    "category": str,
+    "source": str,
+    "confidence": float
+}
+
+INDEXED_COLUMNS = ("type", "intent", "category", "source")
+
+SQLITE_MAX_VARIABLES = 900
+
+LEXICAL_MAX_TERMS = 32
+
+
+class SqliteMetadataStore:
+
+    def __init__(self, path: Path, lexical: bool = True):
+        self.path = Path(path)
+        self.lexical = lexical
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        column_sql = ", ".join(
+            f"{name} {'REAL' if kind is float else 'TEXT'}" for name, kind in TYPED_COLUMNS.items()
+        )
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS metadata (id INTEGER PRIMARY KEY, {column_sql}, extra TEXT)")
+        for name in INDEXED_COLUMNS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS metadata_{name} ON metadata ({name})")
+
+        if lexical:
+            exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'metadata_fts'").fetchone()
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS metadata_fts USING fts5(text, content='metadata', content_rowid='id')"
+            )
+            if not exists:
+                self._conn.execute("INSERT INTO metadata_fts(metadata_fts) VALUES ('rebuild')")
+
+        self._executor = None
+        self._select = f"SELECT id, {', '.join(TYPED_COLUMNS)}, extra FROM metadata"
+        self._count = self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, vector_id: int) -> Dict[str, Any]:
+        row = self._conn.execute(f"{self._select} WHERE id = ?", (int(vector_id),)).fetchone()
+        if row is None:
+            raise IndexError(vector_id)
+        return self._decode(row)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in self._conn.execute(f"{self._select} ORDER BY id"):
+            yield self._decode(row)
+
+    def ids(self) -> np.ndarray:
+        return np.array([row[0] for row in self._conn.execute("SELECT id FROM metadata ORDER BY id")], dtype=np.int64)
+
+    def next_id(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM metadata").fetchone()[0]
+
+    def get_many(self, vector_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        vector_ids = [int(vector_id) for vector_id in vector_ids]
+        entries = {}
+        for start in range(0, len(vector_ids), SQLITE_MAX_VARIABLES):
+            chunk = vector_ids[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self._conn.execute(f"{self._select} WHERE id IN ({placeholders})", chunk):
+                entries[row[0]] = self._decode(row)
+        return [entries[vector_id] for vector_id in vector_ids if vector_id in entries]
+
+    def iter_fields(self, fields: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        fields = ["id"] + [field for field in fields if field != "id"]
+        if any(field not in TYPED_COLUMNS for field in fields[1:]):
+            for entry in self:
+                yield {field: entry[field] for field in fields if field in entry}
+            return
+
+        for row in self._conn.execute(f"SELECT {', '.join(fields)} FROM metadata ORDER BY id"):
+            yield {field: value for field, value in zip(fields, row) if value is not None}
+
+    def find(
+        self,
+        filter_metadata: Dict[str, Any],
+        limit: Optional[int] = None,
+        newest_first: bool = False
+    ) -> List[Dict[str, Any]]:
+        typed = {key: value for key, value in filter_metadata.items() if self._is_typed(key, value)}
+        clauses = " AND ".join(f"{key} = ?" for key in typed)
+        query = f"{self._select}{' WHERE ' + clauses if clauses else ''} ORDER BY id{' DESC' if newest_first else ''}"
+
+        results = []
+        for row in self._conn.execute(query, list(typed.values())):
+            entry = self._decode(row)
+            if all(entry.get(key) == value for key, value in filter_metadata.items()):
+                results.append(entry)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def matching_ids(self, filter_metadata: Dict[str, Any], candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        entries = self.get_many(candidates) if candidates is not None else self.find(filter_metadata)
+        return np.array([
+            entry["id"] for entry in entries
+            if all(entry.get(key) == value for key, value in filter_metadata.items())
+        ], dtype=np.int64)
+
+    def expired_ids(self, name: str, cutoff: str) -> np.ndarray:
+        rows = self._conn.execute(
+            "SELECT id FROM metadata WHERE (type = ? OR source = ?) "
+            "AND COALESCE(json_extract(extra, '$.last_seen_at'), timestamp) < ?",
+            (name, name, cutoff)
+        )
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def lexical_search(
+        self,
+        query: str,
+        limit: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))[:LEXICAL_MAX_TERMS]
+        if not self.lexical or not terms or limit <= 0:
+            return []
+
+        sql = "SELECT rowid, bm25(metadata_fts) FROM metadata_fts WHERE metadata_fts MATCH ?"
+        params = [" OR ".join(f'"{term}"' for term in terms)]
+        fetch = limit
+        if candidates is not None and len(candidates) <= SQLITE_MAX_VARIABLES:
+            sql += f" AND rowid IN ({', '.join('?' * len(candidates))})"
+            params.extend(int(vector_id) for vector_id in candidates)
+        elif candidates is not None:
+            fetch = limit * 4
+
+
+        rows = self._conn.execute(f"{sql} ORDER BY bm25(metadata_fts) LIMIT ?", params + [fetch]).fetchall()
+        if candidates is not None and len(candidates) > SQLITE_MAX_VARIABLES:
+            allowed = np.isin([row[0] for row in rows], candidates)
+            rows = [row for row, keep in zip(rows, allowed) if keep]
+        return [(row[0], -row[1]) for row in rows[:limit]]
+
+    def append(self, entry: Dict[str, Any]):
+        row = self._encode(int(entry["id"]), entry)
+        self._conn.execute(self._insert_sql(), row)
+        self._index_text([row])
+        self._count += 1
+
+    def extend(self, entries: Iterable[Dict[str, Any]]):
+        rows = [self._encode(int(entry["id"]), entry) for entry in entries]
+        if not rows:
+            return
+
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(self._insert_sql(), rows)
+            self._index_text(rows)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._count += len(rows)
+
+    def update_entry(self, vector_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+        return self.update_many([(vector_id, updates)])[0]
+
+    def update_many(self, updates: Sequence[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        entries = []
+        self._conn.execute("BEGIN")
+        try:
+            for vector_id, changes in updates:
+                entry = self[vector_id]
+                previous = self._encode(int(vector_id), entry)
+                entry.update(changes)
+                row = self._encode(int(vector_id), entry)
+
+                if previous[1] != row[1]:
+                    self._unindex_text([previous])
+                    self._conn.execute(self._insert_sql(), row)
+                    self._index_text([row])
+                else:
+                    self._conn.execute(self._insert_sql(), row)
+                entries.append(entry)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return entries
+
+    async def apply(self, write: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), write, *args)
+
+    def delete(self, vector_ids: Sequence[int]):
+        vector_ids = [(int(vector_id),) for vector_id in vector_ids]
+        if not vector_ids:
+            return
+
+        self._conn.execute("BEGIN")
+        try:
+            if self.lexical:
+                rows = [self._conn.execute("SELECT id, text FROM metadata WHERE id = ?", vector_id).fetchone() for vector_id in vector_ids]
+                self._unindex_text([row for row in rows if row is not None])
+            self._conn.executemany("DELETE FROM metadata WHERE id = ?", vector_ids)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._count = self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    def clear(self):
+        if self.lexical:
+            self._conn.execute("INSERT INTO metadata_fts(metadata_fts) VALUES ('delete-all')")
+        self._conn.execute("DELETE FROM metadata")
+        self._count = 0
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._conn.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metadata-writer")
+        return self._executor
+
+    def _insert_sql(self) -> str:
+        columns = ", ".join(TYPED_COLUMNS)
+        placeholders = ", ".join("?" * (len(TYPED_COLUMNS) + 2))
+        return f"INSERT OR REPLACE INTO metadata (id, {columns}, extra) VALUES ({placeholders})"
+
+    def _index_text(self, rows: List[tuple]):
+        if self.lexical:
+            self._conn.executemany(
+                "INSERT INTO metadata_fts(rowid, text) VALUES (?, ?)",
+                [(row[0], row[1]) for row in rows if row[1] is not None]
+            )
+
+    def _unindex_text(self, rows: List[tuple]):
+        if self.lexical:
+            self._conn.executemany(
+                "INSERT INTO metadata_fts(metadata_fts, rowid, text) VALUES ('delete', ?, ?)",
+                [(row[0], row[1]) for row in rows if row[1] is not None]
+            )
+
+    def _is_typed(self, key: str, value: Any) -> bool:
+        kind = TYPED_COLUMNS.get(key)
+        return kind is not None and type(value) is kind
+
+    def _encode(self, vector_id: int, entry: Dict[str, Any]) -> tuple:
+        typed = []
+        extra = {}
+        for name in TYPED_COLUMNS:
+            value = entry.get(name)
+            typed.append(value if self._is_typed(name, value) else None)
+
+        for key, value in entry.items():
+            if key != "id" and not self._is_typed(key, value):
+                extra[key] = value
+        return (vector_id, *typed, json.dumps(extra, default=str) if extra else None)
+
+    def _decode(self, row: tuple) -> Dict[str, Any]:
+        entry = {"id": row[0]}
+        for name, value in zip(TYPED_COLUMNS, row[1:]):
+            if value is not None:
+                entry[name] = value
+        if row[-1]:
+            entry.update(json.loads(row[-1]))
+        return entry
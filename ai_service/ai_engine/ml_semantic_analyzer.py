@@ -3,6 +3,7 @@ import re
 import json
 from datetime import datetime
 
+from ai_engine.candidate_set import CandidateSet
 from ai_engine.embedding_model import AdvancedEmbeddingModel
 from ai_engine.vector_store import VectorStore
 from ai_engine.knowledge_base import KnowledgeBase
@@ -26,6 +27,11 @@ class MLSemanticAnalyzer:
 
 
         self.intent_examples = {}
+        self.intent_candidates = CandidateSet([], labels=[])
+        self.follow_up_candidates = CandidateSet([
+            "tell me more", "what about", "how about", "and", "also",
+            "can you explain", "what does that mean"
+        ])
         self.entity_models = {}
 
     async def initialize(self):
@@ -57,6 +63,14 @@ class MLSemanticAnalyzer:
             examples = await self.vector_store.get_by_intent(intent, top_k=10)
             self.intent_examples[intent] = [ex["text"] for ex in examples]
 
+        texts = []
+        labels = []
+        for intent, examples in self.intent_examples.items():
+            texts.extend(examples)
+            labels.extend([intent] * len(examples))
+        self.intent_candidates.update(texts, labels)
+        await self.intent_candidates.ensure_built(self.embedding_model)
+
     async def analyze(
         self,
         message: str,
@@ -159,22 +173,15 @@ class MLSemanticAnalyzer:
 
         intent_scores = {}
 
-        for intent, examples in self.intent_examples.items():
-            if not examples:
-                continue
-
 
-            similarities = await self.embedding_model.find_most_similar(
-                query=message,
-                candidates=examples,
-                top_k=min(3, len(examples)),
-                threshold=0.3
-            )
+        await self.intent_candidates.ensure_built(self.embedding_model)
+        message_embedding = await self.embedding_model.encode([message])
+        intent_matches = self.intent_candidates.top_k_by_label(message_embedding, top_k=3, threshold=0.3)
 
-            if similarities:
+        for intent, similarities in intent_matches.items():
 
-                avg_similarity = sum(score for _, score in similarities) / len(similarities)
-                intent_scores[intent] = avg_similarity
+            avg_similarity = sum(score for _, score in similarities) / len(similarities)
+            intent_scores[intent] = avg_similarity
 
 
         similar_patterns = await self.vector_store.search(
@@ -354,14 +361,14 @@ class MLSemanticAnalyzer:
             return True
 
 
-        follow_up_examples = [
-            "tell me more", "what about", "how about", "and", "also",
-            "can you explain", "what does that mean"
-        ]
-
-        for example in follow_up_examples:
-            if await self.embedding_model.similarity(message.lower(), example) > 0.6:
-                return True
+        follow_up_matches = await self.embedding_model.find_most_similar(
+            query=message.lower(),
+            candidates=self.follow_up_candidates,
+            top_k=1,
+            threshold=0.6
+        )
+        if follow_up_matches and follow_up_matches[0][1] > 0.6:
+            return True
 
         return False
 
@@ -874,61 +874,56 @@ class OnlinePretrainer:
         understood_info: Dict[str, Any],
         category: str
     ) -> int:
-        count = 0
+        texts = []
+        metadatas = []
+        trained_at = datetime.utcnow().isoformat()
 
 
         synthesized = understood_info.get("synthesized_info", "")
         if synthesized and len(synthesized.strip()) >= 100:
-            await self.vector_store.add(
-                text=synthesized,
-                metadata={
-                    "type": "pretrained_knowledge",
-                    "topic": topic,
-                    "category": category,
-                    "source": "online_pretraining",
-                    "trained_at": datetime.utcnow().isoformat(),
-                    "understanding_confidence": understood_info.get("confidence", 0.5)
-                }
-            )
-            count += 1
+            texts.append(synthesized)
+            metadatas.append({
+                "type": "pretrained_knowledge",
+                "topic": topic,
+                "category": category,
+                "source": "online_pretraining",
+                "trained_at": trained_at,
+                "understanding_confidence": understood_info.get("confidence", 0.5)
+            })
 
 
         takeaways = understood_info.get("key_takeaways", [])
         for takeaway in takeaways:
             if len(takeaway.strip()) >= 40:
-                await self.vector_store.add(
-                    text=takeaway,
-                    metadata={
-                        "type": "pretrained_knowledge",
-                        "topic": topic,
-                        "category": category,
-                        "subtype": "key_takeaway",
-                        "source": "online_pretraining",
-                        "trained_at": datetime.utcnow().isoformat()
-                    }
-                )
-                count += 1
+                texts.append(takeaway)
+                metadatas.append({
+                    "type": "pretrained_knowledge",
+                    "topic": topic,
+                    "category": category,
+                    "subtype": "key_takeaway",
+                    "source": "online_pretraining",
+                    "trained_at": trained_at
+                })
 
 
         insights = understood_info.get("understood_insights", [])
         for insight in insights[:5]:
             text = insight.get("text", "")
             if text and len(text.strip()) >= 50:
-                await self.vector_store.add(
-                    text=text,
-                    metadata={
-                        "type": "pretrained_knowledge",
-                        "topic": topic,
-                        "category": category,
-                        "subtype": "insight",
-                        "relevance": insight.get("relevance", 0),
-                        "source": "online_pretraining",
-                        "trained_at": datetime.utcnow().isoformat()
-                    }
-                )
-                count += 1
+                texts.append(text)
+                metadatas.append({
+                    "type": "pretrained_knowledge",
+                    "topic": topic,
+                    "category": category,
+                    "subtype": "insight",
+                    "relevance": insight.get("relevance", 0),
+                    "source": "online_pretraining",
+                    "trained_at": trained_at
+                })
 
-        return count
+        if texts:
+            await self.vector_store.add_many(texts, metadatas)
+        return len(texts)
 
     async def pretrain_specific_market(self, location: str):
         logger.info(f"[PRETRAINING] Pretraining on market: {location}")
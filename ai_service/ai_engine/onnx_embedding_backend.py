@@ -0,0 +1,235 @@
+from typing import Dict, Any, List, Callable
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import inspect
+import os
+import re
+import time
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+PARITY_PROBE_TEXTS = [
+    "What is the cap rate for multifamily properties in NYC?",
+    "How does fractional ownership of real estate work?",
+    "Show me properties under $500k in Miami",
+    "Rental income grew 4% year over year while vacancy rates fell across Atlanta suburbs.",
+    "wallet balance",
+    "Compare the Miami and Atlanta housing markets for long-term appreciation and cash flow, "
+    "taking into account property taxes, insurance costs and expected population growth."
+]
+
+
+class _TransformerHiddenState(torch.nn.Module):
+
+    def __init__(self, transformer: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.transformer = transformer
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.transformer(**dict(zip(self.input_names, inputs)))[0]
+
+
+class OnnxEmbeddingBackend:
+
+    def __init__(self, model, model_name: str, export_dir: str = "memory/onnx", quantize: bool = True):
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+
+        self.model = model
+        self.model_name = model_name
+        self.quantize = quantize
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+        self.pooling_mode = self._detect_pooling_mode()
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.export_dir = Path(export_dir) / slug
+        self.model_path = self.export_dir / "model.onnx"
+        self.quantized_path = self.export_dir / "model.int8.onnx"
+        self.lock_path = self.export_dir / "export.lock"
+
+        self.session = None
+        self.input_names = []
+
+    def prepare(self):
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._file_lock():
+            if not self._is_complete(self.model_path):
+                logger.info(f"Exporting {self.model_name} to ONNX: {self.model_path}")
+                self._write_artifact(self.model_path, self._export)
+
+            session_path = self.model_path
+            if self.quantize:
+                if not self._is_complete(self.quantized_path):
+                    logger.info(f"Quantizing ONNX embedding model to int8: {self.quantized_path}")
+                    self._write_artifact(
+                        self.quantized_path,
+                        lambda path: quantize_dynamic(str(self.model_path), str(path), weight_type=QuantType.QInt8)
+                    )
+                session_path = self.quantized_path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(session_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        logger.info(f"[OK] ONNX embedding backend ready ({session_path.name}, pooling={self.pooling_mode})")
+
+    def encode(self, texts: List[str], batch_size: int = 32, max_seq_length: int = None) -> np.ndarray:
+        max_length = max_seq_length or self.max_seq_length
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(batch, padding=True, truncation=True, max_length=max_length, return_tensors="np")
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            outputs.append(self._pool(hidden, encoded["attention_mask"]))
+
+        if not outputs:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        embeddings = np.vstack(outputs).astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.clip(norms, 1e-12, None)
+
+    def check_parity(self, reference_encode: Callable[[List[str], int], np.ndarray], texts: List[str] = None) -> float:
+        texts = texts or PARITY_PROBE_TEXTS
+        reference = reference_encode(texts, len(texts))
+        candidate = self.encode(texts, len(texts))
+        return float(np.min(np.sum(reference * candidate, axis=1)))
+
+    def _write_artifact(self, path: Path, write: Callable[[Path], None]):
+        tmp_path = path.with_name(f"{path.stem}.tmp{path.suffix}")
+        digest_path = self._digest_path(path)
+        tmp_path.unlink(missing_ok=True)
+        digest_path.unlink(missing_ok=True)
+
+        write(tmp_path)
+        digest = _file_digest(tmp_path)
+        os.replace(tmp_path, path)
+        digest_path.write_text(digest)
+
+    def _is_complete(self, path: Path) -> bool:
+        digest_path = self._digest_path(path)
+        if not path.exists() or not digest_path.exists():
+            return False
+        if digest_path.read_text().strip() != _file_digest(path):
+            logger.warning(f"{path.name} does not match its recorded digest, rebuilding it")
+            return False
+        return True
+
+    def _digest_path(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}.sha256")
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _export(self, path: Path):
+        transformer = self.model[0].auto_model
+        sample = self.tokenizer(["export sample"], return_tensors="pt")
+        input_names = list(sample.keys())
+
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        export_kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs["dynamo"] = False
+
+        wrapper = _TransformerHiddenState(transformer, input_names).to("cpu").eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                wrapper,
+                tuple(sample[name].to("cpu") for name in input_names),
+                str(path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                **export_kwargs
+            )
+
+    def _detect_pooling_mode(self) -> str:
+        for module in self.model:
+            if hasattr(module, "get_pooling_mode_str"):
+                return module.get_pooling_mode_str()
+        return "mean"
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling_mode == "cls":
+            return hidden[:, 0]
+
+        mask = attention_mask[..., None].astype(np.float32)
+        if self.pooling_mode == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+
+        summed = (hidden * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def benchmark(model_name: str, quantize: bool = True, runs: int = 20, batch_size: int = 32) -> Dict[str, Any]:
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    backend = OnnxEmbeddingBackend(model, model_name, quantize=quantize)
+    backend.prepare()
+
+    def torch_encode(texts: List[str], size: int) -> np.ndarray:
+        return model.encode(texts, batch_size=size, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True)
+
+    texts = PARITY_PROBE_TEXTS * max(1, batch_size // len(PARITY_PROBE_TEXTS))
+    results = {"model_name": model_name, "quantized": quantize, "texts_per_run": len(texts), "runs": runs}
+
+    for name, encode_fn in [("torch", torch_encode), ("onnx", backend.encode)]:
+        encode_fn(texts, batch_size)
+        started = time.perf_counter()
+        for _ in range(runs):
+            encode_fn(texts, batch_size)
+        elapsed = time.perf_counter() - started
+        results[f"{name}_texts_per_second"] = round(len(texts) * runs / elapsed, 1)
+
+    results["speedup"] = round(results["onnx_texts_per_second"] / results["torch_texts_per_second"], 2)
+    results["min_cosine_agreement"] = round(backend.check_parity(torch_encode), 5)
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    from config import settings
+
+    print(json.dumps(benchmark(settings.embedding_model, quantize=settings.embedding_onnx_quantize), indent=2))
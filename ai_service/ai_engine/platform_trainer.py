@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import json
 from datetime import datetime
 import asyncio
@@ -57,6 +57,7 @@ class PlatformTrainer:
         logger.info("Loading comprehensive knowledge base into vector store...")
 
         knowledge_count = 0
+        duplicates_before = self.vector_store.get_stats().get("duplicates_skipped", 0)
 
 
         investment_knowledge = self.comprehensive_kb.get("real_estate_investment", {})
@@ -98,25 +99,51 @@ class PlatformTrainer:
             category="user_help"
         )
 
-        logger.info(f"Loaded {knowledge_count} knowledge items into vector store")
+        duplicates_skipped = self.vector_store.get_stats().get("duplicates_skipped", 0) - duplicates_before
+        logger.info(f"Loaded {knowledge_count} knowledge items into vector store ({duplicates_skipped} already present)")
 
     async def _embed_and_store_knowledge(
         self,
         knowledge_dict: Dict[str, Any],
         knowledge_type: str,
+        category: str
+    ) -> int:
+        loop = asyncio.get_running_loop()
+        items = await loop.run_in_executor(None, self._collect_knowledge_items, knowledge_dict, category)
+        if not items:
+            return 0
+
+        loaded_at = datetime.utcnow().isoformat()
+        await self.vector_store.add_many(
+            [knowledge_text for _, knowledge_text in items],
+            [
+                {
+                    "type": "prior_knowledge",
+                    "knowledge_type": knowledge_type,
+                    "category": category,
+                    "key": full_key,
+                    "source": "comprehensive_knowledge_base",
+                    "loaded_at": loaded_at
+                }
+                for full_key, _ in items
+            ]
+        )
+        return len(items)
+
+    def _collect_knowledge_items(
+        self,
+        knowledge_dict: Dict[str, Any],
         category: str,
         parent_key: str = ""
-    ) -> int:
-        count = 0
+    ) -> List[Tuple[str, str]]:
+        items = []
 
         for key, value in knowledge_dict.items():
             full_key = f"{parent_key}.{key}" if parent_key else key
 
             if isinstance(value, dict):
 
-                count += await self._embed_and_store_knowledge(
-                    value, knowledge_type, category, full_key
-                )
+                items.extend(self._collect_knowledge_items(value, category, full_key))
             elif isinstance(value, (str, list)):
 
                 if isinstance(value, list):
@@ -125,23 +152,9 @@ class PlatformTrainer:
                     text = str(value)
 
 
-                knowledge_text = f"{category}: {full_key}\n\n{text}"
+                items.append((full_key, f"{category}: {full_key}\n\n{text}"))
 
-
-                await self.vector_store.add(
-                    text=knowledge_text,
-                    metadata={
-                        "type": "prior_knowledge",
-                        "knowledge_type": knowledge_type,
-                        "category": category,
-                        "key": full_key,
-                        "source": "comprehensive_knowledge_base",
-                        "loaded_at": datetime.utcnow().isoformat()
-                    }
-                )
-                count += 1
-
-        return count
+        return items
 
     async def _load_platform_knowledge(self):
 
@@ -733,25 +746,12 @@ class PlatformTrainer:
     async def get_training_stats(self) -> Dict[str, Any]:
         try:
 
-            all_knowledge = await self.vector_store.search(
-                query="knowledge platform trainer",
-                top_k=1000,
-                threshold=0.1
-            )
-
             stats = {
-                "total_knowledge_entries": len(all_knowledge),
-                "by_intent": {},
-                "by_source": {}
+                "total_knowledge_entries": self.vector_store.get_stats().get("vectors", 0),
+                "by_intent": self.vector_store.count_by("intent"),
+                "by_source": self.vector_store.count_by("source")
             }
 
-            for entry in all_knowledge:
-                intent = entry.get("intent", "unknown")
-                source = entry.get("source", "unknown")
-
-                stats["by_intent"][intent] = stats["by_intent"].get(intent, 0) + 1
-                stats["by_source"][source] = stats["by_source"].get(source, 0) + 1
-
             return stats
         except Exception as e:
             logger.error(f"Error getting training stats: {e}")
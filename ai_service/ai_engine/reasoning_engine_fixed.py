@@ -486,25 +486,26 @@ class AdvancedReasoningEngine:
 
 
             insights = []
-            for step in thinking_steps:
+            step_results = []
+            if self.vector_store:
+                step_results = await self.vector_store.search_many(
+                    queries=thinking_steps,
+                    top_k=5,
+                    thresholds=0.3
+                )
 
-                if self.vector_store:
-                    relevant_knowledge = await self.vector_store.search(
-                        query=step,
-                        top_k=5,
-                        threshold=0.3
-                    )
+            for step, relevant_knowledge in zip(thinking_steps, step_results):
 
-                    if relevant_knowledge:
+                if relevant_knowledge:
 
-                        knowledge_texts = [k.get("text", "")[:200] for k in relevant_knowledge[:3]]
-                        insight = {
-                            "step": step,
-                            "relevant_knowledge": knowledge_texts,
-                            "reasoning": f"Found {len(relevant_knowledge)} relevant knowledge items for: {step[:50]}..."
-                        }
-                        insights.append(insight)
-                        reasoning_result["thinking_steps"].append(insight)
+                    knowledge_texts = [k.get("text", "")[:200] for k in relevant_knowledge[:3]]
+                    insight = {
+                        "step": step,
+                        "relevant_knowledge": knowledge_texts,
+                        "reasoning": f"Found {len(relevant_knowledge)} relevant knowledge items for: {step[:50]}..."
+                    }
+                    insights.append(insight)
+                    reasoning_result["thinking_steps"].append(insight)
 
 
             if insights:
@@ -758,38 +759,23 @@ class AdvancedReasoningEngine:
             results = await self.vector_store.search(
                 query=search_query,
                 top_k=20,
-                threshold=0.2
+                threshold=0.2,
+                collection="knowledge",
+                hybrid=True
             )
 
 
-            if not results and entities.get("location"):
-                location_query = f"{entities.get('location')} real estate market"
+            if not results:
+                fallback_query = f"{entities.get('location', '')} real estate market analysis investment trends prices".strip()
                 results = await self.vector_store.search(
-                    query=location_query,
-                    top_k=15,
-                    threshold=0.2
+                    query=fallback_query,
+                    top_k=10,
+                    threshold=0.15,
+                    collection="knowledge",
+                    hybrid=True
                 )
 
 
-            if not results:
-
-                broad_queries = [
-                    "real estate market analysis investment",
-                    f"{entities.get('location', '')} market",
-                    "market trends prices",
-                    "real estate investment"
-                ]
-                for broad_query in broad_queries:
-                    if broad_query.strip():
-                        results = await self.vector_store.search(
-                            query=broad_query,
-                            top_k=10,
-                            threshold=0.15
-                        )
-                        if results:
-                            break
-
-
             for result in results:
                 raw_metadata = result.get("metadata")
                 metadata = raw_metadata if isinstance(raw_metadata, dict) else result
@@ -0,0 +1,79 @@
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+import json
+
+from ai_engine.embedding_cache import normalize_text_key
+
+
+class SearchResultCache:
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(0, int(max_entries))
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key_for(
+        self,
+        query: str,
+        top_k: int,
+        filter_metadata: Optional[Dict[str, Any]],
+        threshold: float,
+        collection: Optional[str],
+        hybrid: bool
+    ) -> tuple:
+        return (
+            normalize_text_key(query),
+            int(top_k),
+            json.dumps(filter_metadata, sort_keys=True, default=str) if filter_metadata else None,
+            float(threshold),
+            collection,
+            hybrid
+        )
+
+    def get(self, key: tuple, versions: tuple) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry[0] != versions:
+            del self._entries[key]
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return [dict(hit) for hit in entry[1]]
+
+    def put(self, key: tuple, versions: tuple, results: List[Dict[str, Any]]):
+        if self.max_entries == 0:
+            return
+
+        self._entries[key] = (versions, [dict(hit) for hit in results])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,78 @@
+from typing import Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SearchExecutor:
+
+    def __init__(self, max_workers: int = 4, omp_threads: int = 1):
+        self.max_workers = max_workers
+        self.omp_threads = omp_threads
+
+
+        self._executor = None
+        self._lock = threading.Lock()
+
+        self.searches = 0
+        self.inline_searches = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.busy_seconds = 0.0
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        self.searches += 1
+        if self.max_workers <= 0:
+            self.inline_searches += 1
+            return fn(*args)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self._call, fn, args)
+        finally:
+            self.in_flight -= 1
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threads": self.max_workers,
+            "omp_threads": self.omp_threads,
+            "searches": self.searches,
+            "inline_searches": self.inline_searches,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "busy_seconds": round(self.busy_seconds, 3)
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vector-search")
+        return self._executor
+
+    def _call(self, fn: Callable, args: tuple) -> Any:
+        if FAISS_AVAILABLE and self.omp_threads > 0:
+            faiss.omp_set_num_threads(self.omp_threads)
+
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.busy_seconds += time.perf_counter() - started
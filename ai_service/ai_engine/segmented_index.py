@@ -0,0 +1,290 @@
+from typing import Dict, Any, Optional, Tuple
+from pathlib import Path
+import json
+import os
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+from ai_engine.matrix_index import RowIdMap
+
+
+class FlatIndexView:
+
+    def __init__(self, base: np.ndarray, delta: np.ndarray, ids: RowIdMap):
+        self.base = base
+        self.delta = delta
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self.ids
+
+    @property
+    def ntotal(self) -> int:
+        return self.base.shape[0] + self.delta.shape[0]
+
+    @property
+    def base_rows(self) -> int:
+        return self.base.shape[0]
+
+    @property
+    def dead_rows(self) -> int:
+        return self.ids.dead_rows
+
+    def __getitem__(self, ids: np.ndarray) -> np.ndarray:
+        return self.reconstruct_batch(self.ids.rows_for(ids))
+
+    def search(self, queries: np.ndarray, top_k: int, row_index=None) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        row_k = max(1, min(top_k + self.dead_rows, self.ntotal))
+
+        if row_index is not None:
+            scores, rows = row_index.search(queries, row_k)
+        else:
+            scores, rows = self._search_rows(queries, row_k)
+        ids = self.ids.ids_at(rows)
+
+
+        if self.dead_rows or row_index is not None:
+            scores = np.where(ids >= 0, scores, -np.inf).astype(np.float32)
+            order = np.argsort(-scores, axis=1, kind="stable")
+            scores = np.take_along_axis(scores, order, axis=1)
+            ids = np.take_along_axis(ids, order, axis=1)
+        return scores[:, :top_k], ids[:, :top_k]
+
+    def reconstruct_n(self, start: int, count: int) -> np.ndarray:
+        return self.reconstruct_batch(np.arange(start, start + count))
+
+    def reconstruct_batch(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.empty((len(rows), self.base.shape[1]), dtype=np.float32)
+        in_base = rows < self.base_rows
+        vectors[in_base] = self.base[rows[in_base]]
+        if not in_base.all():
+            vectors[~in_base] = self.delta[rows[~in_base] - self.base_rows]
+        return vectors
+
+    def _search_rows(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        parts = []
+
+        if self.base_rows:
+            scores, rows = faiss.knn(queries, self.base, min(top_k, self.base_rows), metric=faiss.METRIC_INNER_PRODUCT)
+            parts.append((scores, rows))
+        if self.delta.shape[0]:
+            scores, rows = faiss.knn(queries, self.delta, min(top_k, self.delta.shape[0]), metric=faiss.METRIC_INNER_PRODUCT)
+            parts.append((scores, np.where(rows >= 0, rows + self.base_rows, -1)))
+
+        if not parts:
+            return (
+                np.full((len(queries), top_k), -np.inf, dtype=np.float32),
+                np.full((len(queries), top_k), -1, dtype=np.int64)
+            )
+        if len(parts) == 1:
+            return parts[0]
+
+
+        scores = np.concatenate([part[0] for part in parts], axis=1)
+        rows = np.concatenate([part[1] for part in parts], axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+
+class SegmentedFlatIndex:
+
+    def __init__(self, dimension: int, use_mmap: bool = True, initial_capacity: int = 1024):
+        self.dimension = dimension
+        self.use_mmap = use_mmap
+        self.initial_capacity = max(1, initial_capacity)
+        self.base = np.zeros((0, dimension), dtype=np.float32)
+        self.base_path = None
+        self.delta_rows = 0
+        self._delta = np.zeros((0, dimension), dtype=np.float32)
+        self.ids = RowIdMap()
+        self._publish()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self.ids
+
+    @property
+    def ntotal(self) -> int:
+        return self.base.shape[0] + self.delta_rows
+
+    @property
+    def base_rows(self) -> int:
+        return self.base.shape[0]
+
+    @property
+    def next_id(self) -> int:
+        return self.ids.next_id
+
+    @property
+    def dead_rows(self) -> int:
+        return self.ids.dead_rows
+
+    def __getitem__(self, ids: np.ndarray) -> np.ndarray:
+        return self.view[ids]
+
+    def open_base(self, path: Path, ids: Optional[np.ndarray] = None):
+        base = np.load(str(path), mmap_mode="r" if self.use_mmap else None)
+        if base.ndim != 2 or base.shape[1] != self.dimension or base.dtype != np.float32:
+            raise ValueError(f"Unexpected vector snapshot shape {base.shape} ({base.dtype}) in {path}")
+        if ids is None:
+            ids = np.arange(base.shape[0], dtype=np.int64)
+        if len(ids) != base.shape[0]:
+            raise ValueError(f"Vector snapshot {path} has {base.shape[0]} rows but {len(ids)} ids")
+
+        next_id = self.ids.next_id
+        self.base = base
+        self.base_path = Path(path)
+        self.delta_rows = 0
+        self._delta = np.zeros((0, self.dimension), dtype=np.float32)
+        self.ids.reset()
+        self.ids.append(ids)
+        self.ids.reserve(next_id)
+        self._publish()
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        self._reserve_delta(self.delta_rows + len(vectors))
+        self._delta[self.delta_rows:self.delta_rows + len(vectors)] = vectors
+        self.delta_rows += len(vectors)
+        self.ids.append(ids)
+        self._publish()
+
+    def remove(self, ids: np.ndarray) -> int:
+        removed = len(self.ids.remove(ids))
+        if removed:
+            self._publish()
+        return removed
+
+    def search(self, queries: np.ndarray, top_k: int, row_index=None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.view.search(queries, top_k, row_index)
+
+    def reconstruct_n(self, start: int, count: int) -> np.ndarray:
+        return self.view.reconstruct_n(start, count)
+
+    def reconstruct_batch(self, rows: np.ndarray) -> np.ndarray:
+        return self.view.reconstruct_batch(rows)
+
+    def reset(self):
+        self.base = np.zeros((0, self.dimension), dtype=np.float32)
+        self.base_path = None
+        self.delta_rows = 0
+        self._delta = np.zeros((0, self.dimension), dtype=np.float32)
+        self.ids.reset()
+        self._publish()
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        view = self.view
+        return view.base, view.delta, view.ids.row_ids
+
+    def rebase(self, path: Path, ids: np.ndarray, captured_rows: int):
+        tail_ids = self.ids.row_ids[captured_rows:]
+        tail_rows = np.arange(captured_rows, self.ntotal)[tail_ids >= 0]
+        tail = self.reconstruct_batch(tail_rows)
+        tail_ids = tail_ids[tail_ids >= 0].copy()
+        removed = ids[self.ids.rows_for(ids) < 0]
+
+        self.open_base(path, ids)
+        self.remove(removed)
+        if len(tail):
+            self.add(tail, tail_ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "base_vectors": self.base_rows,
+            "delta_vectors": self.delta_rows,
+            "delta_capacity": self._delta.shape[0],
+            "tombstones": self.dead_rows,
+            "mmap": isinstance(self.base, np.memmap),
+            "resident_bytes": self._delta.nbytes + (0 if isinstance(self.base, np.memmap) else self.base.nbytes),
+            "base_path": str(self.base_path) if self.base_path else None
+        }
+
+    def _publish(self):
+        self.view = FlatIndexView(self.base, self._delta[:self.delta_rows], self.ids.snapshot())
+
+    def _reserve_delta(self, required: int):
+        if required <= self._delta.shape[0]:
+            return
+
+        capacity = max(self.initial_capacity, self._delta.shape[0])
+        while capacity < required:
+            capacity *= 2
+
+        delta = np.zeros((capacity, self.dimension), dtype=np.float32)
+        delta[:self.delta_rows] = self._delta[:self.delta_rows]
+        self._delta = delta
+
+
+def snapshot_paths(storage_path: Path, name: str, generation: int) -> Tuple[Path, Path]:
+    storage_path = Path(storage_path)
+    return (
+        storage_path / f"{name}.vectors.{generation}.npy",
+        storage_path / f"{name}.ids.{generation}.npy"
+    )
+
+
+def read_vector_manifest(storage_path: Path, name: str) -> Optional[Dict[str, Any]]:
+    manifest_path = Path(storage_path) / f"{name}.manifest.json"
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def write_vector_snapshot(
+    storage_path: Path,
+    name: str,
+    generation: int,
+    base: np.ndarray,
+    delta: np.ndarray,
+    row_ids: np.ndarray,
+    next_id: int,
+    chunk_rows: int = 65536
+) -> np.ndarray:
+    storage_path = Path(storage_path)
+    vectors_path, ids_path = snapshot_paths(storage_path, name, generation)
+    keep = row_ids >= 0
+    base_rows = base.shape[0]
+
+    output = np.lib.format.open_memmap(str(vectors_path), mode="w+", dtype=np.float32, shape=(int(keep.sum()), delta.shape[1]))
+    offset = 0
+    for start in range(0, base_rows, chunk_rows):
+        stop = min(start + chunk_rows, base_rows)
+        rows = base[start:stop][keep[start:stop]]
+        output[offset:offset + len(rows)] = rows
+        offset += len(rows)
+    output[offset:] = delta[keep[base_rows:]]
+    output.flush()
+    del output
+
+    ids = row_ids[keep]
+    np.save(str(ids_path), ids)
+
+
+    manifest_path = storage_path / f"{name}.manifest.json"
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"generation": generation, "next_id": int(next_id)}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, manifest_path)
+
+    for path in storage_path.glob(f"{name}.*.npy"):
+        if path not in (vectors_path, ids_path):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    return ids
@@ -1,9 +1,10 @@
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 import json
+import os
 import pickle
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import asyncio
 
 try:
@@ -13,148 +14,843 @@ except ImportError:
     FAISS_AVAILABLE = False
     print("Warning: FAISS not available. Using simple in-memory vector store.")
 
+from ai_engine.ann_index import AnnIndexManager, RERANKED_INDEX_TYPES
+from ai_engine.candidate_set import normalize_rows
+from ai_engine.embedding_cache import normalize_text_key, text_key_hash
 from ai_engine.embedding_model import AdvancedEmbeddingModel
+from ai_engine.matrix_index import NumpyMatrixIndex, subset_search
+from ai_engine.metadata_index import MetadataIndex
+from ai_engine.metadata_store import SqliteMetadataStore
+from ai_engine.result_cache import SearchResultCache
+from ai_engine.search_executor import SearchExecutor
+from ai_engine.segmented_index import SegmentedFlatIndex, read_vector_manifest, snapshot_paths, write_vector_snapshot
+from ai_engine.vector_wal import VectorWriteAheadLog, OP_ADD, OP_UPDATE, OP_DELETE, OP_ADD_BATCH
 from config import settings
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+DEFAULT_COLLECTION = "default"
+BOOKKEEPING_METADATA_KEYS = {
+    "timestamp", "merge_count", "last_seen_at", "learned_at", "loaded_at",
+    "trained_at", "reinforced_at", "avoided_at", "scraped_at"
+}
+
+
+def _collection_routes() -> Dict[str, str]:
+    routes = {}
+    for item in settings.vector_collections.split(";"):
+        name, _, types = item.partition("=")
+        for type_name in types.split(","):
+            if name.strip() and type_name.strip():
+                routes[type_name.strip()] = name.strip()
+    return routes
+
+
+def _collection_path(name: str) -> Path:
+    if name == DEFAULT_COLLECTION:
+        return Path("memory/vector_store")
+    return Path("memory/vector_store/collections") / name
+
+
+def _indexed_metadata_keys() -> List[str]:
+    return [key.strip() for key in settings.vector_indexed_metadata_keys.split(",") if key.strip()]
+
+
+def _filtered_ids(
+    metadata_index: MetadataIndex,
+    metadata: SqliteMetadataStore,
+    filter_metadata: Optional[Dict[str, Any]]
+) -> Optional[np.ndarray]:
+    if not filter_metadata:
+        return None
+
+    ids = metadata_index.candidates(filter_metadata)
+    if metadata_index.covers(filter_metadata):
+        return ids
+
+
+    unindexed = {key: value for key, value in filter_metadata.items() if key not in metadata_index.keys}
+    return metadata.matching_ids(unindexed, ids)
+
+
+def _content_key(text: str, metadata: Dict[str, Any]) -> bytes:
+    return text_key_hash(f"{metadata.get('type', '')}\0{normalize_text_key(text)}")
+
+
+def _build_content_index(metadata: SqliteMetadataStore) -> Dict[bytes, int]:
+    content_index = {}
+    for entry in metadata.iter_fields(("type", "text")):
+        content_index.setdefault(_content_key(entry.get("text", ""), entry), entry["id"])
+    return content_index
+
+
+def _forget_entries(
+    metadata_index: MetadataIndex,
+    content_index: Dict[bytes, int],
+    content_aliases: Dict[int, List[bytes]],
+    entries: List[Dict[str, Any]]
+):
+    for entry in entries:
+        metadata_index.remove(entry["id"], entry)
+        for content_key in [_content_key(entry.get("text", ""), entry)] + content_aliases.pop(entry["id"], []):
+            if content_index.get(content_key) == entry["id"]:
+                del content_index[content_key]
+
+
+def _orphans(vector_ids: np.ndarray, metadata: SqliteMetadataStore) -> Tuple[np.ndarray, np.ndarray]:
+    metadata_ids = metadata.ids()
+    return np.setdiff1d(vector_ids, metadata_ids), np.setdiff1d(metadata_ids, vector_ids)
+
+
+def _retention_policies() -> Dict[str, float]:
+    policies = {}
+    for item in settings.vector_retention_days.split(","):
+        name, _, days = item.partition("=")
+        if name.strip() and days.strip():
+            policies[name.strip()] = float(days)
+    return policies
+
+
+def _expired_ids(metadata: SqliteMetadataStore, policies: Dict[str, float]) -> np.ndarray:
+    now = datetime.utcnow()
+    expired = [
+        metadata.expired_ids(name, (now - timedelta(days=days)).isoformat())
+        for name, days in policies.items()
+    ]
+    return np.unique(np.concatenate(expired)) if expired else np.zeros(0, dtype=np.int64)
+
+
+async def _retention_loop(store):
+    while True:
+        try:
+            await store.expire_stale()
+        except Exception as e:
+            logger.error(f"Error expiring stale vectors: {e}", exc_info=True)
+        await asyncio.sleep(settings.vector_retention_interval_seconds)
+
+
+async def _cancel_task(task: Optional[asyncio.Task]):
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def _upsert_updates(existing: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    updates = {key: value for key, value in metadata.items() if existing.get(key) != value}
+    if updates.keys() <= BOOKKEEPING_METADATA_KEYS:
+        return {}
+    return updates
+
+
+def _staged_entry(metadata: SqliteMetadataStore, pending: Dict[int, Dict[str, Any]], vector_id: int) -> Dict[str, Any]:
+    return {**metadata[vector_id], **pending.get(vector_id, {})}
+
+
+def _stage_update(pending: Dict[int, Dict[str, Any]], vector_id: int, updates: Dict[str, Any]):
+    if updates:
+        pending.setdefault(vector_id, {}).update(updates)
+
+
+def _near_duplicate_types() -> set:
+    return {value.strip() for value in settings.vector_near_duplicate_types.split(",") if value.strip()}
+
+
+def _near_duplicate_updates(existing: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    updates = {
+        "merge_count": existing.get("merge_count", 1) + 1,
+        "last_seen_at": datetime.utcnow().isoformat()
+    }
+
+    confidence = metadata.get("confidence", existing.get("confidence"))
+    existing_confidence = existing.get("confidence", confidence)
+    if isinstance(confidence, (int, float)) and isinstance(existing_confidence, (int, float)):
+        updates["confidence"] = round(1.0 - (1.0 - existing_confidence) * (1.0 - confidence), 4)
+    return updates
+
+
+def _split_batch(
+    content_keys: List[bytes],
+    content_index: Dict[bytes, int]
+) -> Tuple[List[int], List[Tuple[int, Optional[int], Optional[int]]]]:
+    fresh = []
+    repeats = []
+    first_seen = {}
+    for position, content_key in enumerate(content_keys):
+        if not settings.vector_dedup_enabled:
+            fresh.append(position)
+        elif content_key in content_index:
+            repeats.append((position, content_index[content_key], None))
+        elif content_key in first_seen:
+            repeats.append((position, None, first_seen[content_key]))
+        else:
+            first_seen[content_key] = position
+            fresh.append(position)
+    return fresh, repeats
+
+
+def _batch_entries(
+    texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    positions: List[int],
+    vector_ids: List[int]
+) -> List[Dict[str, Any]]:
+    timestamp = datetime.utcnow().isoformat()
+    return [
+        {"id": int(vector_id), "text": texts[position], "timestamp": timestamp, **metadatas[position]}
+        for position, vector_id in zip(positions, vector_ids)
+    ]
+
+
+async def _encode_missing(
+    embedding_model: AdvancedEmbeddingModel,
+    texts: List[str],
+    positions: List[int],
+    encoded: Dict[int, np.ndarray]
+):
+    missing = [position for position in positions if position not in encoded]
+    if missing:
+        encoded.update(zip(missing, await embedding_model.encode([texts[position] for position in missing])))
+
+
+async def _rebuild_vectors(embedding_model: AdvancedEmbeddingModel, metadata: SqliteMetadataStore, add_vectors) -> int:
+    entries = list(metadata.iter_fields(("text",)))
+    batch_size = max(1, settings.encoder_max_batch_texts)
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start:start + batch_size]
+        vectors = np.asarray(await embedding_model.encode([entry.get("text", "") for entry in batch]), dtype=np.float32)
+        add_vectors(normalize_rows(vectors), np.array([entry["id"] for entry in batch], dtype=np.int64))
+    return len(entries)
+
+
+async def _near_duplicate_ids(
+    embeddings: np.ndarray,
+    metadatas: List[Dict[str, Any]],
+    near_duplicate_types: set,
+    metadata: SqliteMetadataStore,
+    metadata_index: MetadataIndex,
+    search_subset,
+    executor: SearchExecutor,
+    min_id: int = 0
+) -> List[Optional[Tuple[float, int]]]:
+    found = [None] * len(metadatas)
+    groups = {}
+    for position, item in enumerate(metadatas):
+        if item.get("type") in near_duplicate_types:
+            groups.setdefault(item["type"], []).append(position)
+
+    searches = []
+    for type_name, positions in groups.items():
+        ids = _filtered_ids(metadata_index, metadata, {"type": type_name})
+        ids = ids[ids >= min_id]
+        if len(ids) > 0:
+            searches.append((positions, executor.run(search_subset, embeddings[positions], ids, 1)))
+
+    results = await asyncio.gather(*[search for _, search in searches])
+    for (positions, _), (scores, indices) in zip(searches, results):
+        for position, score, vector_id in zip(positions, scores[:, 0], indices[:, 0]):
+            if vector_id != -1 and score >= settings.vector_near_duplicate_threshold:
+                found[position] = (float(score), int(vector_id))
+    return found
+
+
+def _merge_near_duplicates(
+    fresh: List[int],
+    candidates: Dict[int, Tuple[float, int]],
+    recent: Dict[int, Tuple[float, int]],
+    index
+) -> List[Optional[int]]:
+    duplicates = []
+    for position in fresh:
+        hits = [hit for hit in (candidates.get(position), recent.get(position)) if hit and hit[1] in index]
+        duplicates.append(max(hits)[1] if hits else None)
+    return duplicates
+
+
+def _create_wal(storage_path: Path, name: str) -> VectorWriteAheadLog:
+    return VectorWriteAheadLog(
+        storage_path,
+        name,
+        flush_interval_ms=settings.vector_wal_flush_interval_ms,
+        fsync=settings.vector_wal_fsync
+    )
+
+
+def _per_query(value: Any, count: int) -> List[Any]:
+    if isinstance(value, (list, tuple)):
+        if len(value) != count:
+            raise ValueError(f"Expected {count} per-query values, got {len(value)}")
+        return list(value)
+    return [value] * count
+
+
+def _collect_results(
+    metadata: SqliteMetadataStore,
+    similarities: np.ndarray,
+    indices: np.ndarray,
+    filter_metadata: Optional[Dict[str, Any]],
+    threshold: float
+) -> List[Dict[str, Any]]:
+    hits = [
+        (int(idx), float(similarity))
+        for similarity, idx in zip(similarities, indices)
+        if idx != -1 and similarity >= threshold
+    ]
+    entries = metadata.get_many([idx for idx, _ in hits])
+    scores = dict(hits)
+
+    results = []
+    for metadata_entry in entries:
+        metadata_entry["similarity"] = scores[metadata_entry["id"]]
+
+
+        if filter_metadata:
+            match = all(
+                metadata_entry.get(key) == value
+                for key, value in filter_metadata.items()
+            )
+            if not match:
+                continue
+
+        results.append(metadata_entry)
+
+    return results
+
+
+def _search_executor() -> SearchExecutor:
+    return SearchExecutor(settings.vector_search_threads, settings.vector_search_omp_threads)
+
+
+async def _search_batch(
+    query_embeddings: np.ndarray,
+    top_ks: List[int],
+    filters: List[Optional[Dict[str, Any]]],
+    thresholds: List[float],
+    metadata: SqliteMetadataStore,
+    metadata_index: MetadataIndex,
+    search_all,
+    search_subset,
+    executor: SearchExecutor
+) -> List[List[Dict[str, Any]]]:
+    results = [[] for _ in top_ks]
+
+    groups = {}
+    for position, filter_metadata in enumerate(filters):
+        group_key = json.dumps(filter_metadata, sort_keys=True, default=str) if filter_metadata else None
+        groups.setdefault(group_key, (filter_metadata, []))[1].append(position)
+
+
+    searches = []
+    for filter_metadata, positions in groups.values():
+        top_k = max(1, max(top_ks[position] for position in positions))
+        candidate_ids = _filtered_ids(metadata_index, metadata, filter_metadata)
+        if candidate_ids is None:
+            search = executor.run(search_all, query_embeddings[positions], top_k)
+        elif len(candidate_ids) == 0:
+            continue
+        else:
+            search = executor.run(search_subset, query_embeddings[positions], candidate_ids, min(top_k, len(candidate_ids)))
+        searches.append((filter_metadata, positions, search))
+
+    found = await asyncio.gather(*[search for _, _, search in searches])
+    for (filter_metadata, positions, _), (similarities, indices) in zip(searches, found):
+        for row, position in enumerate(positions):
+            limit = top_ks[position]
+            results[position] = _collect_results(
+                metadata,
+                similarities[row][:limit],
+                indices[row][:limit],
+                filter_metadata,
+                thresholds[position]
+            )
+
+    return results
+
+
+def _hybrid_results(
+    query: str,
+    query_embedding: np.ndarray,
+    dense_hits: List[Dict[str, Any]],
+    filter_metadata: Optional[Dict[str, Any]],
+    top_k: int,
+    metadata: SqliteMetadataStore,
+    metadata_index: MetadataIndex,
+    get_vectors
+) -> List[Dict[str, Any]]:
+    depth = max(top_k, settings.vector_hybrid_candidates)
+    candidates = _filtered_ids(metadata_index, metadata, filter_metadata)
+    if candidates is not None and len(candidates) == 0:
+        return []
+    lexical_hits = metadata.lexical_search(query, depth, candidates)
+
+
+    scores = {}
+    for rank, hit in enumerate(dense_hits):
+        scores[hit["id"]] = 1.0 / (settings.vector_hybrid_rrf_k + rank + 1)
+    for rank, (vector_id, _) in enumerate(lexical_hits):
+        scores[vector_id] = scores.get(vector_id, 0.0) + 1.0 / (settings.vector_hybrid_rrf_k + rank + 1)
+
+    entries = {hit["id"]: hit for hit in dense_hits}
+    missing = [vector_id for vector_id, _ in lexical_hits if vector_id not in entries]
+    if missing:
+        query_embedding = query_embedding / max(float(np.linalg.norm(query_embedding)), 1e-12)
+        similarities = dict(zip(missing, get_vectors(missing) @ query_embedding))
+        for entry in metadata.get_many(missing):
+            entry["similarity"] = float(similarities[entry["id"]])
+            entries[entry["id"]] = entry
+
+    bm25_scores = dict(lexical_hits)
+    results = []
+    for vector_id in sorted(scores, key=scores.get, reverse=True)[:top_k]:
+        entry = entries[vector_id]
+        entry["hybrid_score"] = scores[vector_id]
+        if vector_id in bm25_scores:
+            entry["bm25"] = bm25_scores[vector_id]
+        results.append(entry)
+    return results
+
+
+def _find_by(
+    metadata: SqliteMetadataStore,
+    metadata_index: MetadataIndex,
+    key: str,
+    value: Any,
+    limit: Optional[int]
+) -> List[Dict[str, Any]]:
+    if key in metadata_index.keys:
+        return metadata.get_many(metadata_index.newest(key, value, limit))
+    return metadata.find({key: value}, limit=limit, newest_first=True)
+
+
+def _count_by(metadata: SqliteMetadataStore, metadata_index: MetadataIndex, key: str) -> Dict[Any, int]:
+    if key in metadata_index.keys:
+        return metadata_index.values(key)
+
+    counts = {}
+    for entry in metadata.iter_fields((key,)):
+        if key in entry:
+            counts[entry[key]] = counts.get(entry[key], 0) + 1
+    return counts
+
+
 class SimpleVectorStore:
 
-    def __init__(self, embedding_model: AdvancedEmbeddingModel):
+    def __init__(
+        self,
+        embedding_model: AdvancedEmbeddingModel,
+        storage_path: Optional[Path] = None,
+        search_executor: Optional[SearchExecutor] = None
+    ):
         self.embedding_model = embedding_model
-        self.vectors = []
-        self.metadata = []
+        self.search_executor = search_executor or _search_executor()
         self.dimension = 384
+        self.vectors = NumpyMatrixIndex(self.dimension, chunk_rows=settings.vector_search_chunk_rows)
+        self.metadata_index = MetadataIndex(_indexed_metadata_keys())
+        self.content_index = {}
+        self.content_aliases = {}
+        self.duplicates_skipped = 0
+        self.near_duplicate_types = _near_duplicate_types()
+        self.near_duplicates_merged = 0
+        self.retention_policies = _retention_policies()
+        self.deleted = 0
+        self.expired = 0
+        self.revision = 0
         self.ready = False
-        self.storage_path = Path("memory/vector_store")
+        self.storage_path = Path(storage_path or _collection_path(DEFAULT_COLLECTION))
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.metadata = SqliteMetadataStore(self.storage_path / "simple_metadata.db")
+        self.wal = _create_wal(self.storage_path, "simple_store")
+        self._write_lock = asyncio.Lock()
+        self._compaction_lock = asyncio.Lock()
+        self._compaction_task = None
+        self._retention_task = None
 
     async def initialize(self):
         logger.info("Initializing simple vector store (FAISS not available)...")
         self.dimension = self.embedding_model.get_embedding_dimension()
+        self.vectors = NumpyMatrixIndex(self.dimension, chunk_rows=settings.vector_search_chunk_rows)
         await self._load_from_disk()
+        await asyncio.get_running_loop().run_in_executor(None, self._build_indexes)
         self.ready = True
         logger.info(f"Simple vector store initialized with {len(self.vectors)} vectors")
+        self._maybe_compact()
+        if self.retention_policies:
+            self._retention_task = asyncio.create_task(_retention_loop(self))
 
     async def cleanup(self):
+        await _cancel_task(self._retention_task)
         await self._save_to_disk()
+        await self.wal.close()
+        self.metadata.close()
         self.ready = False
 
     def is_ready(self) -> bool:
         return self.ready
 
     async def add(self, text: str, metadata: Dict[str, Any], embedding: Optional[np.ndarray] = None) -> int:
-        if embedding is None:
-            embeddings = await self.embedding_model.encode([text])
-            embedding = embeddings[0]
-
-        embedding = embedding.astype('float32')
-        self.vectors.append(embedding)
-
-        metadata_entry = {
-            "id": len(self.vectors) - 1,
-            "text": text,
-            "timestamp": datetime.utcnow().isoformat(),
-            **metadata
-        }
-        self.metadata.append(metadata_entry)
+        ids = await self.add_many([text], [metadata], None if embedding is None else np.asarray(embedding).reshape(1, -1))
+        return ids[0]
 
+    async def add_many(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[int]:
+        if len(texts) != len(metadatas):
+            raise ValueError(f"Expected {len(texts)} metadata entries, got {len(metadatas)}")
+
+        content_keys = [_content_key(text, metadata) for text, metadata in zip(texts, metadatas)]
+        encoded = {} if embeddings is None else dict(enumerate(np.asarray(embeddings, dtype=np.float32)))
+        checked = _split_batch(content_keys, self.content_index)[0]
+        await _encode_missing(self.embedding_model, texts, checked, encoded)
+        checked_below = self.vectors.ids.next_id
+        candidates = await self._find_near_duplicates(checked, encoded, metadatas)
+
+
+        async with self._write_lock:
+            fresh, repeats = _split_batch(content_keys, self.content_index)
+            ids = [None] * len(texts)
+            pending = {}
+
+            if fresh:
+                await _encode_missing(self.embedding_model, texts, fresh, encoded)
+                vectors = normalize_rows(np.array([encoded[position] for position in fresh], dtype=np.float32))
+                recent = await self._find_near_duplicates(
+                    fresh, encoded, metadatas, checked_below if set(fresh) <= set(checked) else 0
+                )
+                duplicates = _merge_near_duplicates(fresh, candidates, recent, self.vectors)
+
+
+                inserted = [row for row, duplicate_id in enumerate(duplicates) if duplicate_id is None]
+                if inserted:
+                    positions = [fresh[row] for row in inserted]
+                    vector_ids = np.arange(self.vectors.ids.next_id, self.vectors.ids.next_id + len(inserted))
+                    entries = _batch_entries(texts, metadatas, positions, vector_ids)
+                    await self.metadata.apply(self.metadata.extend, entries)
+                    self.vectors.add(vectors[inserted], vector_ids)
+                    for position, entry in zip(positions, entries):
+                        self.metadata_index.add(entry["id"], entry)
+                        self.content_index.setdefault(content_keys[position], entry["id"])
+                        ids[position] = entry["id"]
+                    self.revision += 1
+                    self.wal.append(OP_ADD_BATCH, [entry["id"] for entry in entries], vectors[inserted], entries)
+
+                for position, duplicate_id in zip(fresh, duplicates):
+                    if duplicate_id is not None:
+                        ids[position] = self._merge_near_duplicate(
+                            duplicate_id, content_keys[position], metadatas[position], pending
+                        )
+
+            for position, existing_id, first_position in repeats:
+                ids[position] = self._upsert_duplicate(
+                    existing_id if existing_id is not None else ids[first_position], metadatas[position], pending
+                )
+            await self._apply_updates(pending)
+            self._maybe_compact()
+        return ids
 
-        if len(self.vectors) % 10 == 0:
-            await self._save_to_disk()
+    def _upsert_duplicate(self, vector_id: int, metadata: Dict[str, Any], pending: Dict[int, Dict[str, Any]]) -> int:
+        self.duplicates_skipped += 1
+        _stage_update(pending, vector_id, _upsert_updates(_staged_entry(self.metadata, pending, vector_id), metadata))
+        return vector_id
 
-        return len(self.vectors) - 1
+    async def _find_near_duplicates(
+        self,
+        positions: List[int],
+        encoded: Dict[int, np.ndarray],
+        metadatas: List[Dict[str, Any]],
+        min_id: int = 0
+    ) -> Dict[int, Tuple[float, int]]:
+        if not positions:
+            return {}
+
+        vectors = self.vectors.view
+        found = await _near_duplicate_ids(
+            normalize_rows(np.array([encoded[position] for position in positions], dtype=np.float32)),
+            [metadatas[position] for position in positions],
+            self.near_duplicate_types,
+            self.metadata,
+            self.metadata_index,
+            lambda queries, ids, k: vectors.search(queries, k, ids=ids),
+            self.search_executor,
+            min_id
+        )
+        return {position: hit for position, hit in zip(positions, found) if hit}
+
+    def _merge_near_duplicate(
+        self,
+        vector_id: int,
+        content_key: bytes,
+        metadata: Dict[str, Any],
+        pending: Dict[int, Dict[str, Any]]
+    ) -> int:
+        self.near_duplicates_merged += 1
+        if content_key not in self.content_index:
+            self.content_index[content_key] = vector_id
+            self.content_aliases.setdefault(vector_id, []).append(content_key)
+        _stage_update(pending, vector_id, _near_duplicate_updates(_staged_entry(self.metadata, pending, vector_id), metadata))
+        return vector_id
 
     async def search(self, query: str, top_k: int = 10, filter_metadata: Optional[Dict[str, Any]] = None, threshold: float = 0.5) -> List[Dict[str, Any]]:
-        if not self.vectors:
-            return []
+        results = await self.search_many([query], top_k, [filter_metadata], threshold)
+        return results[0]
 
-        query_embedding = await self.embedding_model.encode([query])
-        if len(query_embedding) == 0:
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        if not queries:
             return []
+        if len(self.vectors) == 0:
+            return [[] for _ in queries]
 
-        query_vec = query_embedding[0]
-        query_norm = np.linalg.norm(query_vec)
-
+        query_embeddings = await self.embedding_model.encode(list(queries))
+        if len(query_embeddings) == 0:
+            return [[] for _ in queries]
 
-        similarities = []
-        for i, vec in enumerate(self.vectors):
-            vec_norm = np.linalg.norm(vec)
-            if vec_norm > 0 and query_norm > 0:
-                similarity = float(np.dot(query_vec, vec) / (query_norm * vec_norm))
-                if similarity >= threshold:
-                    similarities.append((i, similarity))
+        return await self.search_embeddings(query_embeddings, top_k, filters, thresholds)
 
+    async def search_embeddings(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        vectors = self.vectors.view
+        if len(vectors) == 0:
+            return [[] for _ in query_embeddings]
+
+        return await _search_batch(
+            query_embeddings,
+            _per_query(top_k, len(query_embeddings)),
+            _per_query(filters, len(query_embeddings)),
+            _per_query(thresholds, len(query_embeddings)),
+            self.metadata,
+            self.metadata_index,
+            lambda embeddings, k: vectors.search(embeddings, k),
+            lambda embeddings, ids, k: vectors.search(embeddings, k, ids=ids),
+            self.search_executor
+        )
 
-        similarities.sort(key=lambda x: x[1], reverse=True)
-
+    async def search_hybrid(
+        self,
+        queries: List[str],
+        query_embeddings: np.ndarray,
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        top_ks = _per_query(top_k, len(queries))
+        filters = _per_query(filters, len(queries))
+        dense = await self.search_embeddings(
+            query_embeddings,
+            [max(k, settings.vector_hybrid_candidates) for k in top_ks],
+            filters,
+            thresholds
+        )
 
-        results = []
-        for idx, similarity in similarities[:top_k]:
-            metadata_entry = self.metadata[idx].copy()
-            metadata_entry["similarity"] = similarity
+        return [
+            _hybrid_results(
+                query, embedding, hits, filter_metadata, k, self.metadata, self.metadata_index, self.get_vectors
+            )
+            for query, embedding, hits, filter_metadata, k in zip(queries, query_embeddings, dense, filters, top_ks)
+        ]
 
-            if filter_metadata:
-                match = all(metadata_entry.get(key) == value for key, value in filter_metadata.items())
-                if not match:
-                    continue
+    async def get_by_intent(self, intent: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        return self.find_by("intent", intent, top_k)
 
-            results.append(metadata_entry)
+    def find_by(self, key: str, value: Any, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return _find_by(self.metadata, self.metadata_index, key, value, limit)
 
-        return results
+    def count_by(self, key: str) -> Dict[Any, int]:
+        return _count_by(self.metadata, self.metadata_index, key)
 
-    async def get_by_intent(self, intent: str, top_k: int = 10) -> List[Dict[str, Any]]:
-        results = [entry for entry in self.metadata if entry.get("intent") == intent]
-        return results[:top_k]
+    def get_vectors(self, vector_ids: List[int]) -> np.ndarray:
+        vectors = self.vectors.view
+        return np.stack([vectors.get(vector_id) for vector_id in vector_ids]).reshape(len(vector_ids), self.dimension)
 
     async def learn_pattern(self, user_message: str, intent: str, entities: Dict[str, Any], response: str, confidence: float):
         await self.add(text=user_message, metadata={"type": "user_pattern", "intent": intent, "entities": json.dumps(entities), "confidence": confidence, "learned_at": datetime.utcnow().isoformat()})
         await self.add(text=response, metadata={"type": "response_pattern", "intent": intent, "entities": json.dumps(entities), "confidence": confidence, "learned_at": datetime.utcnow().isoformat()})
 
     async def update_metadata(self, vector_id: int, updates: Dict[str, Any]):
-        if 0 <= vector_id < len(self.metadata):
-            self.metadata[vector_id].update(updates)
-            await self._save_to_disk()
+        async with self._write_lock:
+            await self._apply_updates({vector_id: dict(updates)})
+            self._maybe_compact()
+
+    async def _apply_updates(self, pending: Dict[int, Dict[str, Any]]):
+        pending = {vector_id: updates for vector_id, updates in pending.items() if vector_id in self.vectors}
+        if not pending:
+            return
+
+        previous = self.metadata.get_many(list(pending))
+        current = await self.metadata.apply(self.metadata.update_many, list(pending.items()))
+        for entry, updated in zip(previous, current):
+            self.metadata_index.update(entry["id"], entry, updated)
+        self.revision += 1
+        for vector_id, updates in pending.items():
+            self.wal.append(OP_UPDATE, vector_id, dict(updates))
+
+    async def delete(self, vector_ids: List[int]) -> int:
+        async with self._write_lock:
+            vector_ids = sorted({int(vector_id) for vector_id in vector_ids if int(vector_id) in self.vectors})
+            if not vector_ids:
+                return 0
+
+            entries = self.metadata.get_many(vector_ids)
+            self.vectors.remove(vector_ids)
+            await self.metadata.apply(self.metadata.delete, vector_ids)
+            _forget_entries(self.metadata_index, self.content_index, self.content_aliases, entries)
+            self.deleted += len(vector_ids)
+            self.revision += 1
+
+
+            self.wal.append(OP_DELETE, vector_ids)
+            self._maybe_compact()
+            return len(vector_ids)
+
+    async def expire_stale(self) -> int:
+        removed = await self.delete(_expired_ids(self.metadata, self.retention_policies))
+        if removed:
+            self.expired += removed
+            logger.info(f"Expired {removed} vectors past their retention window")
+        return removed
+
+    def _maybe_compact(self):
+        if self.wal.records_since_snapshot < settings.vector_wal_compact_records:
+            return
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        self._compaction_task = asyncio.create_task(self._save_to_disk())
+
+    def _apply_log_record(self, op: int, fields: tuple):
+        if op == OP_ADD:
+            vector_id, vector, metadata_entry = fields
+            if vector_id not in self.vectors:
+                self.vectors.add(np.asarray(vector, dtype=np.float32).reshape(1, -1), [vector_id])
+                self.metadata.append(metadata_entry)
+        elif op == OP_UPDATE:
+            vector_id, updates = fields
+            if vector_id in self.vectors:
+                self.metadata.update_entry(vector_id, updates)
+        elif op == OP_DELETE:
+            self.vectors.remove(fields[0])
+            self.metadata.delete(fields[0])
+        elif op == OP_ADD_BATCH:
+            for record in zip(*fields):
+                self._apply_log_record(OP_ADD, record)
 
     async def _save_to_disk(self):
-        try:
-            data_path = self.storage_path / "simple_store.pkl"
-            with open(data_path, 'wb') as f:
-                pickle.dump({"vectors": self.vectors, "metadata": self.metadata}, f)
-        except Exception as e:
-            logger.error(f"Error saving simple vector store: {e}")
+        async with self._compaction_lock:
+            try:
+                await self.wal.begin_compaction()
+                view = self.vectors.view
+
+
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._write_snapshot, view.matrix, view.ids.row_ids, self.vectors.ids.next_id)
+                await self.wal.finish_compaction()
+            except Exception as e:
+                logger.error(f"Error saving simple vector store: {e}")
+
+    def _write_snapshot(self, vectors: np.ndarray, ids: np.ndarray, next_id: int):
+        data_path = self.storage_path / "simple_store.pkl"
+        tmp_path = self.storage_path / "simple_store.pkl.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"vectors": vectors, "ids": ids, "next_id": next_id}, f)
+        os.replace(tmp_path, data_path)
+
+    def _build_indexes(self):
+        self.metadata_index.rebuild(self.metadata.iter_fields(self.metadata_index.keys))
+        self.content_index = _build_content_index(self.metadata)
 
     async def _load_from_disk(self):
         try:
-            data_path = self.storage_path / "simple_store.pkl"
-            if data_path.exists():
-                with open(data_path, 'rb') as f:
-                    data = pickle.load(f)
-                    self.vectors = data.get("vectors", [])
-                    self.metadata = data.get("metadata", [])
-                logger.info(f"Loaded simple vector store: {len(self.vectors)} vectors")
+            await asyncio.get_running_loop().run_in_executor(None, self._load_snapshot)
+            logger.info(f"Loaded simple vector store: {len(self.vectors)} vectors")
         except Exception as e:
-            logger.warning(f"Error loading simple vector store: {e}, starting fresh")
-            self.vectors = []
-            self.metadata = []
+            logger.warning(f"Error loading simple vector store: {e}, rebuilding vectors from {self.metadata.path.name}")
+            self.vectors.reset()
+            rebuilt = await _rebuild_vectors(self.embedding_model, self.metadata, self.vectors.add)
+            self.vectors.ids.reserve(self.metadata.next_id())
+            await self._save_to_disk()
+            logger.info(f"Rebuilt {rebuilt} vectors from {self.metadata.path.name}")
 
+    def _load_snapshot(self):
+        data_path = self.storage_path / "simple_store.pkl"
+        if data_path.exists():
+            with open(data_path, 'rb') as f:
+                data = pickle.load(f)
+                vectors = np.asarray(data.get("vectors", []), dtype=np.float32).reshape(-1, self.dimension)
+                self.vectors.reset()
+                if len(vectors):
+                    self.vectors.add(vectors, data.get("ids"))
+                self.vectors.ids.reserve(data.get("next_id", 0))
 
-class VectorStore:
 
-    def __init__(self, embedding_model: AdvancedEmbeddingModel):
+            if data.get("metadata") and len(self.metadata) == 0:
+                logger.info(f"Migrating {len(data['metadata'])} metadata entries to {self.metadata.path.name}")
+                self.metadata.extend(data["metadata"])
+
+        self.vectors.ids.reserve(self.metadata.next_id())
+        orphan_vectors, orphan_entries = _orphans(self.vectors.ids.live_ids(), self.metadata)
+        self.vectors.remove(orphan_vectors)
+        self.metadata.delete(orphan_entries)
+
+
+        for op, fields in self.wal.replay():
+            self._apply_log_record(op, fields)
+
+
+class VectorCollection:
+
+    def __init__(
+        self,
+        embedding_model: AdvancedEmbeddingModel,
+        name: str = DEFAULT_COLLECTION,
+        storage_path: Optional[Path] = None,
+        search_executor: Optional[SearchExecutor] = None
+    ):
         self.embedding_model = embedding_model
+        self.name = name
+        self.search_executor = search_executor or _search_executor()
         self.index = None
+        self.ann = None
         self.simple_store = None
-        self.metadata = []
+        self.metadata_index = MetadataIndex(_indexed_metadata_keys())
+        self.content_index = {}
+        self.content_aliases = {}
+        self.duplicates_skipped = 0
+        self.near_duplicate_types = _near_duplicate_types()
+        self.near_duplicates_merged = 0
+        self.retention_policies = _retention_policies()
+        self.deleted = 0
+        self.expired = 0
         self.dimension = 384
         self.ready = False
-        self.storage_path = Path("memory/vector_store")
+        self.storage_path = Path(storage_path or _collection_path(name))
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.metadata = None
+        self.wal = None
+        self.generation = 0
+        self._revision = 0
+        self._write_lock = asyncio.Lock()
+        self._compaction_lock = asyncio.Lock()
+        self._compaction_task = None
+        self._retention_task = None
 
     async def initialize(self):
-        logger.info("Initializing vector store...")
+        logger.info(f"Initializing vector collection '{self.name}'...")
 
         try:
 
@@ -162,17 +858,34 @@ class VectorStore:
 
             if FAISS_AVAILABLE:
 
-                self.index = faiss.IndexFlatIP(self.dimension)
+                self.metadata = SqliteMetadataStore(self.storage_path / "metadata.db")
+                self.wal = _create_wal(self.storage_path, "index")
+                self.index = SegmentedFlatIndex(
+                    self.dimension,
+                    use_mmap=settings.vector_index_mmap or settings.vector_ann_index_type in RERANKED_INDEX_TYPES
+                )
+                self.ann = AnnIndexManager(
+                    self.dimension,
+                    index_type=settings.vector_ann_index_type,
+                    promotion_threshold=settings.vector_ann_promotion_threshold,
+                    min_recall=settings.vector_ann_min_recall,
+                    rerank_factor=settings.vector_ann_rerank_factor
+                )
 
 
                 await self._load_from_disk()
+                await asyncio.get_running_loop().run_in_executor(None, self._build_indexes)
 
                 self.ready = True
-                logger.info(f"Vector store initialized with {self.index.ntotal} vectors")
+                self.ann.maybe_schedule(self.index)
+                self._maybe_compact()
+                if self.retention_policies:
+                    self._retention_task = asyncio.create_task(_retention_loop(self))
+                logger.info(f"Vector collection '{self.name}' initialized with {len(self.index)} vectors")
             else:
 
                 logger.warning("FAISS not available, using simple vector store")
-                self.simple_store = SimpleVectorStore(self.embedding_model)
+                self.simple_store = SimpleVectorStore(self.embedding_model, self.storage_path, self.search_executor)
                 await self.simple_store.initialize()
                 self.ready = True
         except Exception as e:
@@ -180,61 +893,165 @@ class VectorStore:
 
             if FAISS_AVAILABLE:
                 logger.warning("Falling back to simple vector store")
-                self.simple_store = SimpleVectorStore(self.embedding_model)
+                await self._close_index_storage()
+                self.simple_store = SimpleVectorStore(self.embedding_model, self.storage_path, self.search_executor)
                 await self.simple_store.initialize()
                 self.ready = True
             else:
                 raise
 
     async def cleanup(self):
-        await self._save_to_disk()
+        if self.simple_store:
+            await self.simple_store.cleanup()
+        else:
+            await _cancel_task(self._retention_task)
+            await self._save_to_disk()
+            await self._close_index_storage()
         self.ready = False
 
+    async def _close_index_storage(self):
+        if self.ann:
+            self.ann.close()
+        if self.wal:
+            await self.wal.close()
+            self.wal = None
+        if self.metadata:
+            self.metadata.close()
+            self.metadata = None
+
     def is_ready(self) -> bool:
         if self.simple_store:
             return self.simple_store.is_ready()
         return self.ready and self.index is not None
 
+    @property
+    def revision(self) -> int:
+        if self.simple_store:
+            return self.simple_store.revision
+        return self._revision
+
     async def add(
         self,
         text: str,
         metadata: Dict[str, Any],
         embedding: Optional[np.ndarray] = None
     ) -> int:
+        ids = await self.add_many([text], [metadata], None if embedding is None else np.asarray(embedding).reshape(1, -1))
+        return ids[0]
+
+    async def add_many(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[int]:
         if self.simple_store:
-            return await self.simple_store.add(text, metadata, embedding)
+            return await self.simple_store.add_many(texts, metadatas, embeddings)
 
         if not self.is_ready():
             raise RuntimeError("Vector store not initialized")
+        if len(texts) != len(metadatas):
+            raise ValueError(f"Expected {len(texts)} metadata entries, got {len(metadatas)}")
 
 
-        if embedding is None:
-            embeddings = await self.embedding_model.encode([text])
-            embedding = embeddings[0]
-
-
-        embedding = embedding.reshape(1, -1).astype('float32')
-
+        content_keys = [_content_key(text, metadata) for text, metadata in zip(texts, metadatas)]
+        encoded = {} if embeddings is None else dict(enumerate(np.asarray(embeddings, dtype=np.float32)))
+        checked = _split_batch(content_keys, self.content_index)[0]
+        await _encode_missing(self.embedding_model, texts, checked, encoded)
+        checked_below = self.index.next_id
+        candidates = await self._find_near_duplicates(checked, encoded, metadatas)
 
-        faiss.normalize_L2(embedding)
 
+        async with self._write_lock:
+            fresh, repeats = _split_batch(content_keys, self.content_index)
+            ids = [None] * len(texts)
+            pending = {}
 
-        vector_id = self.index.ntotal
-        self.index.add(embedding)
-
-
-        metadata_entry = {
-            "id": vector_id,
-            "text": text,
-            "timestamp": datetime.utcnow().isoformat(),
-            **metadata
-        }
-        self.metadata.append(metadata_entry)
+            if fresh:
+                await _encode_missing(self.embedding_model, texts, fresh, encoded)
+                vectors = np.array([encoded[position] for position in fresh], dtype='float32')
+                faiss.normalize_L2(vectors)
+                recent = await self._find_near_duplicates(
+                    fresh, encoded, metadatas, checked_below if set(fresh) <= set(checked) else 0
+                )
+                duplicates = _merge_near_duplicates(fresh, candidates, recent, self.index)
+
+
+                inserted = [row for row, duplicate_id in enumerate(duplicates) if duplicate_id is None]
+                if inserted:
+                    positions = [fresh[row] for row in inserted]
+                    batch = np.ascontiguousarray(vectors[inserted])
+                    vector_ids = np.arange(self.index.next_id, self.index.next_id + len(inserted))
+                    entries = _batch_entries(texts, metadatas, positions, vector_ids)
+                    await self.metadata.apply(self.metadata.extend, entries)
+
+                    start_row = self.index.ntotal
+                    self.index.add(batch, vector_ids)
+                    for position, entry in zip(positions, entries):
+                        self.metadata_index.add(entry["id"], entry)
+                        self.content_index.setdefault(content_keys[position], entry["id"])
+                        ids[position] = entry["id"]
+                    self._revision += 1
+                    self.wal.append(OP_ADD_BATCH, [entry["id"] for entry in entries], batch, entries)
+                    await self.ann.add(batch, start_row)
+                    self.ann.maybe_schedule(self.index)
+
+                for position, duplicate_id in zip(fresh, duplicates):
+                    if duplicate_id is not None:
+                        ids[position] = self._merge_near_duplicate(
+                            duplicate_id, content_keys[position], metadatas[position], pending
+                        )
+
+            for position, existing_id, first_position in repeats:
+                ids[position] = self._upsert_duplicate(
+                    existing_id if existing_id is not None else ids[first_position], metadatas[position], pending
+                )
+            await self._apply_updates(pending)
+            self._maybe_compact()
+        return ids
 
+    def _upsert_duplicate(self, vector_id: int, metadata: Dict[str, Any], pending: Dict[int, Dict[str, Any]]) -> int:
+        self.duplicates_skipped += 1
+        _stage_update(pending, vector_id, _upsert_updates(_staged_entry(self.metadata, pending, vector_id), metadata))
+        return vector_id
 
-        if vector_id % 10 == 0:
-            await self._save_to_disk()
+    async def _find_near_duplicates(
+        self,
+        positions: List[int],
+        encoded: Dict[int, np.ndarray],
+        metadatas: List[Dict[str, Any]],
+        min_id: int = 0
+    ) -> Dict[int, Tuple[float, int]]:
+        if not positions:
+            return {}
+
+        embeddings = np.array([encoded[position] for position in positions], dtype='float32')
+        faiss.normalize_L2(embeddings)
+        index = self.index.view
+        found = await _near_duplicate_ids(
+            embeddings,
+            [metadatas[position] for position in positions],
+            self.near_duplicate_types,
+            self.metadata,
+            self.metadata_index,
+            lambda queries, ids, k: subset_search(index, queries, ids, k, settings.vector_search_chunk_rows),
+            self.search_executor,
+            min_id
+        )
+        return {position: hit for position, hit in zip(positions, found) if hit}
 
+    def _merge_near_duplicate(
+        self,
+        vector_id: int,
+        content_key: bytes,
+        metadata: Dict[str, Any],
+        pending: Dict[int, Dict[str, Any]]
+    ) -> int:
+        self.near_duplicates_merged += 1
+        if content_key not in self.content_index:
+            self.content_index[content_key] = vector_id
+            self.content_aliases.setdefault(vector_id, []).append(content_key)
+        _stage_update(pending, vector_id, _near_duplicate_updates(_staged_entry(self.metadata, pending, vector_id), metadata))
         return vector_id
 
     async def search(
@@ -244,51 +1061,170 @@ class VectorStore:
         filter_metadata: Optional[Dict[str, Any]] = None,
         threshold: float = 0.5
     ) -> List[Dict[str, Any]]:
+        results = await self.search_many([query], top_k, [filter_metadata], threshold)
+        return results[0]
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5
+    ) -> List[List[Dict[str, Any]]]:
         if self.simple_store:
-            return await self.simple_store.search(query, top_k, filter_metadata, threshold)
+            return await self.simple_store.search_many(queries, top_k, filters, thresholds)
 
-        if not self.is_ready() or self.index.ntotal == 0:
+        if not queries:
             return []
+        if not self.is_ready() or len(self.index) == 0:
+            return [[] for _ in queries]
 
 
-        query_embedding = await self.embedding_model.encode([query])
-        if len(query_embedding) == 0:
-            return []
+        query_embeddings = await self.embedding_model.encode(list(queries))
+        if len(query_embeddings) == 0:
+            return [[] for _ in queries]
 
-        query_embedding = query_embedding[0].reshape(1, -1).astype('float32')
-        faiss.normalize_L2(query_embedding)
+        return await self.search_embeddings(query_embeddings, top_k, filters, thresholds)
 
+    async def search_embeddings(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        if self.simple_store:
+            return await self.simple_store.search_embeddings(query_embeddings, top_k, filters, thresholds)
+
+        if not self.is_ready() or len(self.index) == 0:
+            return [[] for _ in query_embeddings]
+
+        query_embeddings = np.array(query_embeddings, dtype='float32').reshape(len(query_embeddings), -1)
+        faiss.normalize_L2(query_embeddings)
+
+
+        index = self.index.view
+        row_index = self.ann.row_index(index)
+        return await _search_batch(
+            query_embeddings,
+            _per_query(top_k, len(query_embeddings)),
+            _per_query(filters, len(query_embeddings)),
+            _per_query(thresholds, len(query_embeddings)),
+            self.metadata,
+            self.metadata_index,
+            lambda embeddings, k: index.search(embeddings, k, row_index),
+            lambda embeddings, ids, k: subset_search(
+                index, embeddings, ids, k, settings.vector_search_chunk_rows
+            ),
+            self.search_executor
+        )
 
-        similarities, indices = self.index.search(query_embedding, min(top_k, self.index.ntotal))
+    async def search_hybrid(
+        self,
+        queries: List[str],
+        query_embeddings: np.ndarray,
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        if self.simple_store:
+            return await self.simple_store.search_hybrid(queries, query_embeddings, top_k, filters, thresholds)
+
+        top_ks = _per_query(top_k, len(queries))
+        filters = _per_query(filters, len(queries))
+        dense = await self.search_embeddings(
+            query_embeddings,
+            [max(k, settings.vector_hybrid_candidates) for k in top_ks],
+            filters,
+            thresholds
+        )
 
-        results = []
-        for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-            if idx == -1 or similarity < threshold:
-                continue
+        return [
+            _hybrid_results(
+                query, embedding, hits, filter_metadata, k, self.metadata, self.metadata_index, self.get_vectors
+            )
+            for query, embedding, hits, filter_metadata, k in zip(queries, query_embeddings, dense, filters, top_ks)
+        ]
 
-            metadata_entry = self.metadata[idx].copy()
-            metadata_entry["similarity"] = float(similarity)
+    async def update_metadata(self, vector_id: int, updates: Dict[str, Any]):
+        if self.simple_store:
+            return await self.simple_store.update_metadata(vector_id, updates)
 
+        async with self._write_lock:
+            await self._apply_updates({vector_id: dict(updates)})
+            self._maybe_compact()
 
-            if filter_metadata:
-                match = all(
-                    metadata_entry.get(key) == value
-                    for key, value in filter_metadata.items()
-                )
-                if not match:
-                    continue
+    async def _apply_updates(self, pending: Dict[int, Dict[str, Any]]):
+        pending = {vector_id: updates for vector_id, updates in pending.items() if vector_id in self.index}
+        if not pending:
+            return
 
-            results.append(metadata_entry)
+        previous = self.metadata.get_many(list(pending))
+        current = await self.metadata.apply(self.metadata.update_many, list(pending.items()))
+        for entry, updated in zip(previous, current):
+            self.metadata_index.update(entry["id"], entry, updated)
+        self._revision += 1
+        for vector_id, updates in pending.items():
+            self.wal.append(OP_UPDATE, vector_id, dict(updates))
 
-        return results
+    async def delete(self, vector_ids: List[int]) -> int:
+        if self.simple_store:
+            return await self.simple_store.delete(vector_ids)
 
-    async def update_metadata(self, vector_id: int, updates: Dict[str, Any]):
+        if not self.is_ready():
+            raise RuntimeError("Vector store not initialized")
+
+        async with self._write_lock:
+            vector_ids = sorted({int(vector_id) for vector_id in vector_ids if int(vector_id) in self.index})
+            if not vector_ids:
+                return 0
+
+            entries = self.metadata.get_many(vector_ids)
+            self.index.remove(vector_ids)
+            await self.metadata.apply(self.metadata.delete, vector_ids)
+            _forget_entries(self.metadata_index, self.content_index, self.content_aliases, entries)
+            self.deleted += len(vector_ids)
+            self._revision += 1
+
+
+            self.wal.append(OP_DELETE, vector_ids)
+            self._maybe_compact()
+            return len(vector_ids)
+
+    async def expire_stale(self) -> int:
         if self.simple_store:
-            return await self.simple_store.update_metadata(vector_id, updates)
+            return await self.simple_store.expire_stale()
 
-        if 0 <= vector_id < len(self.metadata):
-            self.metadata[vector_id].update(updates)
-            await self._save_to_disk()
+        removed = await self.delete(_expired_ids(self.metadata, self.retention_policies))
+        if removed:
+            self.expired += removed
+            logger.info(f"Expired {removed} vectors past their retention window")
+        return removed
+
+    def _maybe_compact(self):
+        tombstones = self.index.dead_rows > settings.vector_tombstone_compact_ratio * self.index.ntotal
+        if self.wal.records_since_snapshot < settings.vector_wal_compact_records and not tombstones:
+            return
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        self._compaction_task = asyncio.create_task(self._save_to_disk())
+
+    def _apply_log_record(self, op: int, fields: tuple):
+        if op == OP_ADD:
+            vector_id, vector, metadata_entry = fields
+            if vector_id not in self.index:
+                self.index.add(np.asarray(vector, dtype=np.float32).reshape(1, -1), [vector_id])
+                self.metadata.append(metadata_entry)
+        elif op == OP_UPDATE:
+            vector_id, updates = fields
+            if vector_id in self.index:
+                self.metadata.update_entry(vector_id, updates)
+        elif op == OP_DELETE:
+            self.index.remove(fields[0])
+            self.metadata.delete(fields[0])
+        elif op == OP_ADD_BATCH:
+            for record in zip(*fields):
+                self._apply_log_record(OP_ADD, record)
 
     async def get_by_intent(
         self,
@@ -298,11 +1234,348 @@ class VectorStore:
         if self.simple_store:
             return await self.simple_store.get_by_intent(intent, top_k)
 
-        results = [
-            entry for entry in self.metadata
-            if entry.get("intent") == intent
+        return self.find_by("intent", intent, top_k)
+
+    def find_by(self, key: str, value: Any, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        if self.simple_store:
+            return self.simple_store.find_by(key, value, limit)
+        return _find_by(self.metadata, self.metadata_index, key, value, limit)
+
+    def count_by(self, key: str) -> Dict[Any, int]:
+        if self.simple_store:
+            return self.simple_store.count_by(key)
+        return _count_by(self.metadata, self.metadata_index, key)
+
+    def get_vectors(self, vector_ids: List[int]) -> np.ndarray:
+        if self.simple_store:
+            return self.simple_store.get_vectors(vector_ids)
+        return self.index.view[np.asarray(vector_ids, dtype=np.int64)]
+
+    async def _save_to_disk(self):
+        if self.simple_store:
+            return await self.simple_store._save_to_disk()
+
+        if not FAISS_AVAILABLE or self.index is None:
+            return
+
+        async with self._compaction_lock:
+            try:
+                await self.wal.begin_compaction()
+                base, delta, row_ids = self.index.snapshot()
+                generation = self.generation + 1
+
+
+                loop = asyncio.get_running_loop()
+                ids = await loop.run_in_executor(
+                    None, self._write_snapshot, generation, base, delta, row_ids, self.index.next_id
+                )
+                self.index.rebase(snapshot_paths(self.storage_path, "index", generation)[0], ids, len(row_ids))
+                self.generation = generation
+                if len(ids) < len(row_ids):
+                    self.ann.reset()
+                    self.ann.maybe_schedule(self.index)
+                await loop.run_in_executor(None, self.ann.save, self.storage_path, "index", generation)
+                await self.wal.finish_compaction()
+
+                logger.debug(f"Saved vector store: {len(self.index)} vectors")
+            except Exception as e:
+                logger.error(f"Error saving vector store: {e}", exc_info=True)
+
+    def _write_snapshot(
+        self,
+        generation: int,
+        base: np.ndarray,
+        delta: np.ndarray,
+        row_ids: np.ndarray,
+        next_id: int
+    ) -> np.ndarray:
+        ids = write_vector_snapshot(
+            self.storage_path, "index", generation, base, delta, row_ids, next_id, settings.vector_search_chunk_rows
+        )
+
+        legacy_index_path = self.storage_path / "index.faiss"
+        if legacy_index_path.exists():
+            legacy_index_path.unlink()
+        return ids
+
+    def _build_indexes(self):
+        self.metadata_index.rebuild(self.metadata.iter_fields(self.metadata_index.keys))
+        self.content_index = _build_content_index(self.metadata)
+
+    async def _load_from_disk(self):
+        if not FAISS_AVAILABLE:
+            return
+
+        try:
+            manifest = await asyncio.get_running_loop().run_in_executor(None, self._load_snapshot)
+            logger.info(f"Loaded vector store: {len(self.index)} vectors")
+            if manifest is not None:
+                await self.ann.load(self.storage_path, "index", self.generation, self.index)
+        except Exception as e:
+            logger.warning(f"Error loading vector store: {e}, rebuilding vectors from {self.metadata.path.name}")
+            self.index.reset()
+            self.ann.reset()
+            rebuilt = await _rebuild_vectors(self.embedding_model, self.metadata, self.index.add)
+            self.index.ids.reserve(self.metadata.next_id())
+            await self._save_to_disk()
+            logger.info(f"Rebuilt {rebuilt} vectors from {self.metadata.path.name}")
+
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
+        manifest = read_vector_manifest(self.storage_path, "index")
+        vectors_path = self.storage_path / "index.vectors.npy"
+        index_path = self.storage_path / "index.faiss"
+        metadata_path = self.storage_path / "metadata.pkl"
+
+        if metadata_path.exists() and len(self.metadata) == 0:
+            with open(metadata_path, 'rb') as f:
+                legacy_metadata = pickle.load(f)
+            logger.info(f"Migrating {len(legacy_metadata)} metadata entries to {self.metadata.path.name}")
+            self.metadata.extend(legacy_metadata)
+            metadata_path.unlink()
+
+        if manifest is not None:
+            self.generation = manifest["generation"]
+            base_path, ids_path = snapshot_paths(self.storage_path, "index", self.generation)
+            self.index.open_base(base_path, np.load(str(ids_path)))
+            self.index.ids.reserve(manifest["next_id"])
+        elif vectors_path.exists():
+            self.index.open_base(vectors_path)
+        elif index_path.exists():
+            legacy_index = faiss.read_index(str(index_path))
+            self.index.add(legacy_index.reconstruct_n(0, legacy_index.ntotal), np.arange(legacy_index.ntotal))
+        else:
+            logger.info("No existing vector store snapshot found")
+
+
+        self.index.ids.reserve(self.metadata.next_id())
+        orphan_vectors, orphan_entries = _orphans(self.index.ids.live_ids(), self.metadata)
+        self.index.remove(orphan_vectors)
+        self.metadata.delete(orphan_entries)
+
+
+        for op, fields in self.wal.replay():
+            self._apply_log_record(op, fields)
+        return manifest
+
+    def get_stats(self) -> Dict[str, Any]:
+        if self.simple_store:
+            return {
+                "collection": self.name,
+                "backend": "numpy",
+                "vectors": len(self.simple_store.vectors),
+                "capacity": self.simple_store.vectors.capacity,
+                "duplicates_skipped": self.simple_store.duplicates_skipped,
+                "near_duplicates_merged": self.simple_store.near_duplicates_merged,
+                "deleted": self.simple_store.deleted,
+                "expired": self.simple_store.expired,
+                "retention_days": self.simple_store.retention_policies,
+                "wal": self.simple_store.wal.get_stats()
+            }
+
+        return {
+            "collection": self.name,
+            "backend": "faiss",
+            "vectors": len(self.index) if self.index is not None else 0,
+            "duplicates_skipped": self.duplicates_skipped,
+            "near_duplicates_merged": self.near_duplicates_merged,
+            "deleted": self.deleted,
+            "expired": self.expired,
+            "retention_days": self.retention_policies,
+            "storage": self.index.get_stats() if self.index is not None else None,
+            "index": self.ann.get_stats() if self.ann else None,
+            "wal": self.wal.get_stats()
+        }
+
+
+class VectorStore:
+
+    def __init__(self, embedding_model: AdvancedEmbeddingModel):
+        self.embedding_model = embedding_model
+        self.routes = _collection_routes()
+        self.search_executor = _search_executor()
+        self.result_cache = SearchResultCache(settings.vector_result_cache_size)
+        self.collections = {
+            name: VectorCollection(embedding_model, name, search_executor=self.search_executor)
+            for name in [DEFAULT_COLLECTION] + sorted(set(self.routes.values()) - {DEFAULT_COLLECTION})
+        }
+
+    async def initialize(self):
+        for collection in self.collections.values():
+            await collection.initialize()
+        await self._migrate_routed_entries()
+
+    async def cleanup(self):
+        for collection in self.collections.values():
+            await collection.cleanup()
+        self.search_executor.close()
+
+    def is_ready(self) -> bool:
+        return all(collection.is_ready() for collection in self.collections.values())
+
+    def collection(self, name: str) -> VectorCollection:
+        return self.collections.get(name, self.collections[DEFAULT_COLLECTION])
+
+    def collection_for(self, metadata: Optional[Dict[str, Any]]) -> str:
+        return self.routes.get((metadata or {}).get("type"), DEFAULT_COLLECTION)
+
+    async def add(
+        self,
+        text: str,
+        metadata: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None
+    ) -> int:
+        return await self.collections[self.collection_for(metadata)].add(text, metadata, embedding)
+
+    async def add_many(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[int]:
+        if len(texts) != len(metadatas):
+            raise ValueError(f"Expected {len(texts)} metadata entries, got {len(metadatas)}")
+
+        routed = {}
+        for position, metadata in enumerate(metadatas):
+            routed.setdefault(self.collection_for(metadata), []).append(position)
+
+        ids = [None] * len(texts)
+        for name, positions in routed.items():
+            added = await self.collections[name].add_many(
+                [texts[position] for position in positions],
+                [metadatas[position] for position in positions],
+                None if embeddings is None else np.asarray(embeddings)[positions]
+            )
+            for position, vector_id in zip(positions, added):
+                ids[position] = vector_id
+        return ids
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        threshold: float = 0.5,
+        collection: Optional[str] = None,
+        hybrid: bool = False
+    ) -> List[Dict[str, Any]]:
+        results = await self.search_many([query], top_k, [filter_metadata], threshold, collection, hybrid)
+        return results[0]
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: Any = 10,
+        filters: Any = None,
+        thresholds: Any = 0.5,
+        collections: Any = None,
+        hybrid: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        if not queries:
+            return []
+
+        top_ks = _per_query(top_k, len(queries))
+        filters = _per_query(filters, len(queries))
+        thresholds = _per_query(thresholds, len(queries))
+        names = _per_query(collections, len(queries))
+
+
+        targets = [
+            [self.collection(name).name] if name else self._collections_for_filter(filter_metadata)
+            for name, filter_metadata in zip(names, filters)
         ]
-        return results[:top_k]
+        keys = [
+            self.result_cache.key_for(query, k, filter_metadata, threshold, name, hybrid)
+            for query, k, filter_metadata, threshold, name in zip(queries, top_ks, filters, thresholds, names)
+        ]
+        versions = [tuple(self.collections[name].revision for name in collection_names) for collection_names in targets]
+        results = [self.result_cache.get(key, version) for key, version in zip(keys, versions)]
+        pending = [position for position, hits in enumerate(results) if hits is None]
+        if not pending:
+            return results
+
+        query_embeddings = await self.embedding_model.encode([queries[position] for position in pending])
+        if len(query_embeddings) == 0:
+            return [hits or [] for hits in results]
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32).reshape(len(pending), -1)
+        rows = {position: row for row, position in enumerate(pending)}
+
+
+        routed = {}
+        for position in pending:
+            results[position] = []
+            for name in targets[position]:
+                routed.setdefault(name, []).append(position)
+
+        for name, positions in routed.items():
+            arguments = (
+                query_embeddings[[rows[position] for position in positions]],
+                [top_ks[position] for position in positions],
+                [filters[position] for position in positions],
+                [thresholds[position] for position in positions]
+            )
+            if hybrid:
+                found = await self.collections[name].search_hybrid([queries[position] for position in positions], *arguments)
+            else:
+                found = await self.collections[name].search_embeddings(*arguments)
+
+            for position, hits in zip(positions, found):
+                for hit in hits:
+                    hit["collection"] = name
+                results[position].extend(hits)
+
+        score_key = "hybrid_score" if hybrid else "similarity"
+        for position in pending:
+            hits = results[position]
+            hits.sort(key=lambda hit: hit[score_key], reverse=True)
+            del hits[top_ks[position]:]
+            self.result_cache.put(keys[position], versions[position], hits)
+        return results
+
+    async def update_metadata(self, vector_id: int, updates: Dict[str, Any], collection: str):
+        return await self.collection(collection).update_metadata(vector_id, updates)
+
+    async def delete(self, vector_ids: List[int], collection: str) -> int:
+        return await self.collection(collection).delete(vector_ids)
+
+    async def expire_stale(self) -> int:
+        removed = 0
+        for collection in self.collections.values():
+            removed += await collection.expire_stale()
+        return removed
+
+    async def get_by_intent(
+        self,
+        intent: str,
+        top_k: int = 10,
+        collection: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return self.find_by("intent", intent, top_k, collection)
+
+    def find_by(
+        self,
+        key: str,
+        value: Any,
+        limit: Optional[int] = None,
+        collection: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        names = [self.collection(collection).name] if collection else list(self.collections)
+        results = []
+        for name in names:
+            for entry in self.collections[name].find_by(key, value, limit):
+                entry["collection"] = name
+                results.append(entry)
+
+        if len(names) > 1:
+            results.sort(key=lambda entry: str(entry.get("timestamp", "")), reverse=True)
+        return results[:limit]
+
+    def count_by(self, key: str, collection: Optional[str] = None) -> Dict[Any, int]:
+        counts = {}
+        for name in [self.collection(collection).name] if collection else self.collections:
+            for value, count in self.collections[name].count_by(key).items():
+                counts[value] = counts.get(value, 0) + count
+        return counts
 
     async def learn_pattern(
         self,
@@ -312,10 +1585,6 @@ class VectorStore:
         response: str,
         confidence: float
     ):
-        if self.simple_store:
-            return await self.simple_store.learn_pattern(user_message, intent, entities, response, confidence)
-
-
         await self.add(
             text=user_message,
             metadata={
@@ -340,46 +1609,43 @@ class VectorStore:
         )
 
     async def _save_to_disk(self):
-        if self.simple_store:
-            return await self.simple_store._save_to_disk()
-
-        if not FAISS_AVAILABLE or self.index is None:
-            return
-
-        try:
-
-            index_path = self.storage_path / "index.faiss"
-            faiss.write_index(self.index, str(index_path))
-
-
-            metadata_path = self.storage_path / "metadata.pkl"
-            with open(metadata_path, 'wb') as f:
-                pickle.dump(self.metadata, f)
-
-            logger.debug(f"Saved vector store: {self.index.ntotal} vectors")
-        except Exception as e:
-            logger.error(f"Error saving vector store: {e}", exc_info=True)
-
-    async def _load_from_disk(self):
-        if not FAISS_AVAILABLE:
-            return
-
-        try:
-            index_path = self.storage_path / "index.faiss"
-            metadata_path = self.storage_path / "metadata.pkl"
-
-            if index_path.exists() and metadata_path.exists():
-
-                self.index = faiss.read_index(str(index_path))
-
+        for collection in self.collections.values():
+            await collection._save_to_disk()
+
+    def _collections_for_filter(self, filter_metadata: Optional[Dict[str, Any]]) -> List[str]:
+        if filter_metadata and "type" in filter_metadata:
+            return [self.collection_for(filter_metadata)]
+        return list(self.collections)
+
+    async def _migrate_routed_entries(self):
+        default = self.collections[DEFAULT_COLLECTION]
+        for type_name, name in self.routes.items():
+            if name == DEFAULT_COLLECTION:
+                continue
 
-                with open(metadata_path, 'rb') as f:
-                    self.metadata = pickle.load(f)
+            entries = default.find_by("type", type_name)
+            if not entries:
+                continue
 
-                logger.info(f"Loaded vector store: {self.index.ntotal} vectors")
-            else:
-                logger.info("No existing vector store found, starting fresh")
-        except Exception as e:
-            logger.warning(f"Error loading vector store: {e}, starting fresh")
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.metadata = []
+            vector_ids = [entry["id"] for entry in entries]
+            await self.collections[name].add_many(
+                [entry.get("text", "") for entry in entries],
+                [{key: value for key, value in entry.items() if key not in ("id", "text")} for entry in entries],
+                default.get_vectors(vector_ids)
+            )
+            await default.delete(vector_ids)
+            logger.info(f"Moved {len(entries)} '{type_name}' entries to the '{name}' vector collection")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {name: collection.get_stats() for name, collection in self.collections.items()}
+        return {
+            "backend": stats[DEFAULT_COLLECTION]["backend"],
+            "vectors": sum(collection["vectors"] for collection in stats.values()),
+            "duplicates_skipped": sum(collection["duplicates_skipped"] for collection in stats.values()),
+            "near_duplicates_merged": sum(collection["near_duplicates_merged"] for collection in stats.values()),
+            "deleted": sum(collection["deleted"] for collection in stats.values()),
+            "expired": sum(collection["expired"] for collection in stats.values()),
+            "search_executor": self.search_executor.get_stats(),
+            "result_cache": self.result_cache.get_stats(),
+            "collections": stats
+        }
@@ -0,0 +1,205 @@
+from typing import Dict, Any, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+OP_ADD = 1
+OP_UPDATE = 2
+OP_DELETE = 3
+OP_ADD_BATCH = 4
+
+RECORD_HEADER = struct.Struct("<IIB")
+
+
+def _record_count(op: int, fields: tuple) -> int:
+    return len(fields[0]) if op == OP_ADD_BATCH else 1
+
+
+class VectorWriteAheadLog:
+
+    def __init__(
+        self,
+        storage_path: Path,
+        name: str = "vectors",
+        flush_interval_ms: float = 200.0,
+        fsync: bool = False
+    ):
+        self.storage_path = Path(storage_path)
+        self.log_path = self.storage_path / f"{name}.wal"
+        self.compacting_path = self.storage_path / f"{name}.wal.compacting"
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self.fsync = fsync
+
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._executor = None
+        self._flusher = None
+        self._file = None
+
+        self.records_since_snapshot = 0
+        self.bytes_since_snapshot = 0
+        self.records_written = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.replayed_records = 0
+        self.compactions = 0
+
+    def append(self, op: int, *fields: Any):
+        payload = pickle.dumps(fields, protocol=pickle.HIGHEST_PROTOCOL)
+        record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), op) + payload
+
+        with self._lock:
+            self._pending.append(record)
+        self.records_since_snapshot += _record_count(op, fields)
+        self.bytes_since_snapshot += len(record)
+        self._schedule_flush()
+
+    def replay(self) -> Iterator[Tuple[int, tuple]]:
+        self.records_since_snapshot = 0
+        self.bytes_since_snapshot = 0
+
+        for path in (self.compacting_path, self.log_path):
+            if not path.exists():
+                continue
+
+            data = path.read_bytes()
+            offset = 0
+            while offset < len(data):
+                if offset + RECORD_HEADER.size > len(data):
+                    break
+                length, checksum, op = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+
+                offset = start + length
+                fields = pickle.loads(payload)
+                self.replayed_records += 1
+                self.records_since_snapshot += _record_count(op, fields)
+                self.bytes_since_snapshot += RECORD_HEADER.size + length
+                yield op, fields
+
+            if offset < len(data):
+                logger.warning(f"Discarding {len(data) - offset} bytes of incomplete vector log records in {path.name}")
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._write_pending)
+
+    async def begin_compaction(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._rotate)
+        self.records_since_snapshot = 0
+        self.bytes_since_snapshot = 0
+
+    async def finish_compaction(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._remove_compacted)
+        self.compactions += 1
+
+    async def close(self):
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(self._get_executor(), self._close_file)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending_records": len(self._pending),
+            "records_since_snapshot": self.records_since_snapshot,
+            "bytes_since_snapshot": self.bytes_since_snapshot,
+            "records_written": self.records_written,
+            "bytes_written": self.bytes_written,
+            "flushes": self.flushes,
+            "replayed_records": self.replayed_records,
+            "compactions": self.compactions,
+            "flush_interval_ms": self.flush_interval * 1000.0,
+            "fsync": self.fsync
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-wal")
+        return self._executor
+
+    def _schedule_flush(self):
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_pending()
+            return
+        self._flusher = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing vector log: {e}", exc_info=True)
+
+    def _write_pending(self):
+        with self._lock:
+            records = self._pending
+            self._pending = []
+        if not records:
+            return
+
+        if self._file is None:
+            self.storage_path.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.log_path, "ab")
+
+        data = b"".join(records)
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+        self.records_written += len(records)
+        self.bytes_written += len(data)
+        self.flushes += 1
+
+    def _rotate(self):
+        self._write_pending()
+        self._close_file()
+        if not self.log_path.exists():
+            return
+
+        if self.compacting_path.exists():
+            with open(self.compacting_path, "ab") as target, open(self.log_path, "rb") as source:
+                target.write(source.read())
+            self.log_path.unlink()
+        else:
+            os.replace(self.log_path, self.compacting_path)
+
+    def _remove_compacted(self):
+        if self.compacting_path.exists():
+            self.compacting_path.unlink()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
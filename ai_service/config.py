@@ -24,6 +24,10 @@ class Settings(BaseSettings):
 
     use_local_models: bool = os.getenv("USE_LOCAL_MODELS", "true").lower() == "true"
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    embedding_backend: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    embedding_onnx_quantize: bool = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true"
+    embedding_onnx_path: str = os.getenv("EMBEDDING_ONNX_PATH", "memory/onnx")
+    embedding_onnx_min_cosine: float = float(os.getenv("EMBEDDING_ONNX_MIN_COSINE", "0.98"))
     reasoning_model: str = os.getenv("REASONING_MODEL", "local")
 
 
@@ -32,10 +36,52 @@ class Settings(BaseSettings):
     max_memory_size: int = int(os.getenv("MAX_MEMORY_SIZE", "10000"))
 
 
+    vector_index_mmap: bool = os.getenv("VECTOR_INDEX_MMAP", "true").lower() == "true"
+    vector_search_chunk_rows: int = int(os.getenv("VECTOR_SEARCH_CHUNK_ROWS", "65536"))
+    vector_search_threads: int = int(os.getenv("VECTOR_SEARCH_THREADS", "4"))
+    vector_search_omp_threads: int = int(os.getenv("VECTOR_SEARCH_OMP_THREADS", "1"))
+    vector_dedup_enabled: bool = os.getenv("VECTOR_DEDUP_ENABLED", "true").lower() == "true"
+    vector_near_duplicate_types: str = os.getenv("VECTOR_NEAR_DUPLICATE_TYPES", "continuous_learning,pretrained_knowledge,gap_learning,self_learning_correction")
+    vector_near_duplicate_threshold: float = float(os.getenv("VECTOR_NEAR_DUPLICATE_THRESHOLD", "0.95"))
+    vector_wal_flush_interval_ms: float = float(os.getenv("VECTOR_WAL_FLUSH_INTERVAL_MS", "200"))
+    vector_wal_fsync: bool = os.getenv("VECTOR_WAL_FSYNC", "false").lower() == "true"
+    vector_wal_compact_records: int = int(os.getenv("VECTOR_WAL_COMPACT_RECORDS", "5000"))
+    vector_retention_days: str = os.getenv("VECTOR_RETENTION_DAYS", "continuous_learning=30")
+    vector_retention_interval_seconds: int = int(os.getenv("VECTOR_RETENTION_INTERVAL_SECONDS", "3600"))
+    vector_tombstone_compact_ratio: float = float(os.getenv("VECTOR_TOMBSTONE_COMPACT_RATIO", "0.1"))
+    vector_collections: str = os.getenv("VECTOR_COLLECTIONS", "patterns=user_pattern,response_pattern,entity_pattern,data_source_pattern,learned_pattern,positive_pattern,negative_pattern,intent_example,entity_example,response_example,user_preference;knowledge=knowledge,prior_knowledge,pretrained_knowledge,continuous_learning,gap_learning,self_learning_correction,platform_specific;feedback=positive_feedback_pattern,successful_response_pattern,negative_feedback_pattern,improved_query_pattern,corrected_response_pattern,preferred_response_pattern")
+    vector_hybrid_candidates: int = int(os.getenv("VECTOR_HYBRID_CANDIDATES", "50"))
+    vector_hybrid_rrf_k: int = int(os.getenv("VECTOR_HYBRID_RRF_K", "60"))
+    vector_result_cache_size: int = int(os.getenv("VECTOR_RESULT_CACHE_SIZE", "1024"))
+    vector_indexed_metadata_keys: str = os.getenv("VECTOR_INDEXED_METADATA_KEYS", "type,intent,category,source")
+    vector_ann_index_type: str = os.getenv("VECTOR_ANN_INDEX_TYPE", "none")
+    vector_ann_promotion_threshold: int = int(os.getenv("VECTOR_ANN_PROMOTION_THRESHOLD", "50000"))
+    vector_ann_min_recall: float = float(os.getenv("VECTOR_ANN_MIN_RECALL", "0.9"))
+    vector_ann_recall_noise: float = float(os.getenv("VECTOR_ANN_RECALL_NOISE", "0.5"))
+    vector_ann_nprobe: int = int(os.getenv("VECTOR_ANN_NPROBE", "8"))
+    vector_ann_hnsw_m: int = int(os.getenv("VECTOR_ANN_HNSW_M", "32"))
+    vector_ann_hnsw_ef_construction: int = int(os.getenv("VECTOR_ANN_HNSW_EF_CONSTRUCTION", "80"))
+    vector_ann_hnsw_ef_search: int = int(os.getenv("VECTOR_ANN_HNSW_EF_SEARCH", "32"))
+    vector_ann_pq_m: int = int(os.getenv("VECTOR_ANN_PQ_M", "48"))
+    vector_ann_rerank_factor: int = int(os.getenv("VECTOR_ANN_RERANK_FACTOR", "4"))
+
+
+    lazy_startup: bool = os.getenv("LAZY_STARTUP", "false").lower() == "true"
     max_concurrent_requests: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "100"))
     request_timeout: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
     cache_ttl: int = int(os.getenv("CACHE_TTL", "3600"))
 
+
+    embedding_cache_max_bytes: int = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    embedding_cache_ttl: int = int(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+    embedding_cache_dtype: str = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+    embedding_disk_cache_enabled: bool = os.getenv("EMBEDDING_DISK_CACHE_ENABLED", "true").lower() == "true"
+    embedding_disk_cache_path: str = os.getenv("EMBEDDING_DISK_CACHE_PATH", "memory/embedding_cache")
+    embedding_disk_cache_max_entries: int = int(os.getenv("EMBEDDING_DISK_CACHE_MAX_ENTRIES", "500000"))
+    encoder_batch_wait_ms: float = float(os.getenv("ENCODER_BATCH_WAIT_MS", "5"))
+    encoder_max_batch_texts: int = int(os.getenv("ENCODER_MAX_BATCH_TEXTS", "128"))
+    embedding_passage_max_seq_length: int = int(os.getenv("EMBEDDING_PASSAGE_MAX_SEQ_LENGTH", "128"))
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -42,6 +42,16 @@ online_pretrainer = None
 continuous_learner_bg = None
 feedback_finetuner = None
 self_learning_system = None
+startup_task = None
+
+
+STARTUP_COMPONENTS = [
+    "knowledge_base", "data_service", "reasoning_engine", "warm_up", "platform_trainer",
+    "online_pretrainer", "continuous_learner", "feedback_finetuner", "self_learning_system"
+]
+READINESS_COMPONENTS = ["knowledge_base", "reasoning_engine", "warm_up"]
+component_status = {name: "pending" for name in STARTUP_COMPONENTS}
+component_status_updated = {}
 
 
 @app.on_event("shutdown")
@@ -71,8 +81,23 @@ async def shutdown_event():
         logger.error(f"Error saving data on shutdown: {e}", exc_info=True)
 
 
-@app.on_event("startup")
-async def startup_event():
+def _mark_component(name: str, state: str):
+    component_status[name] = state
+    component_status_updated[name] = datetime.utcnow().isoformat()
+
+
+def is_service_warm() -> bool:
+    return all(component_status[name] == "ready" for name in READINESS_COMPONENTS)
+
+
+async def _warm_up():
+    _mark_component("warm_up", "loading")
+    await reasoning_engine.embedding_model.encode(["warm up real estate investment query"])
+    await reasoning_engine.vector_store.search("warm up real estate investment query", top_k=1, threshold=0.0)
+    _mark_component("warm_up", "ready")
+
+
+async def _initialize_components():
     global reasoning_engine, knowledge_base, data_service
 
     start_time = datetime.utcnow()
@@ -83,42 +108,63 @@ async def startup_event():
 
     logger.info("Initializing AI components...")
 
+    current_component = None
     try:
 
         print("[1/7] Initializing Knowledge Base...")
+        current_component = "knowledge_base"
+        _mark_component(current_component, "loading")
         knowledge_base = KnowledgeBase()
         await knowledge_base.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Knowledge base initialized")
         print("     [OK] Knowledge base initialized\n")
 
 
         print("[2/7] Initializing Data Retrieval Service...")
+        current_component = "data_service"
+        _mark_component(current_component, "loading")
         data_service = DataRetrievalService()
         await data_service.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Data retrieval service initialized")
         print("     [OK] Data retrieval service initialized\n")
 
 
         print("[3/7] Initializing Advanced Reasoning Engine...")
+        current_component = "reasoning_engine"
+        _mark_component(current_component, "loading")
         reasoning_engine = AdvancedReasoningEngine(
             knowledge_base=knowledge_base,
             data_service=data_service
         )
         await reasoning_engine.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Reasoning engine initialized")
         print("     [OK] Reasoning engine initialized\n")
 
 
+        current_component = "warm_up"
+        await _warm_up()
+        logger.info("Embedding model and vector index warmed up")
+
+
         print("[4/7] Initializing Platform Trainer...")
         from ai_engine.platform_trainer import PlatformTrainer
         global platform_trainer
-        platform_trainer = PlatformTrainer(
-            vector_store=reasoning_engine.vector_store,
-            knowledge_base=knowledge_base,
-            embedding_model=reasoning_engine.embedding_model,
-            data_service=data_service
+        current_component = "platform_trainer"
+        _mark_component(current_component, "loading")
+        platform_trainer = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: PlatformTrainer(
+                vector_store=reasoning_engine.vector_store,
+                knowledge_base=knowledge_base,
+                embedding_model=reasoning_engine.embedding_model,
+                data_service=data_service
+            )
         )
         await platform_trainer.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Platform trainer initialized and trained on platform knowledge")
         print("     [OK] Platform trainer initialized\n")
 
@@ -126,12 +172,15 @@ async def startup_event():
         print("[5/7] Initializing Online Pretrainer...")
         from ai_engine.online_pretrainer import OnlinePretrainer
         global online_pretrainer
+        current_component = "online_pretrainer"
+        _mark_component(current_component, "loading")
         online_pretrainer = OnlinePretrainer(
             vector_store=reasoning_engine.vector_store,
             embedding_model=reasoning_engine.embedding_model,
             information_understanding=reasoning_engine.information_understanding
         )
         await online_pretrainer.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Online pretrainer initialized - ready to learn from web sources")
         print("     [OK] Online pretrainer initialized\n")
 
@@ -139,6 +188,8 @@ async def startup_event():
         print("[6/7] Initializing Continuous Background Learner...")
         from ai_engine.continuous_background_learner import ContinuousBackgroundLearner
         global continuous_learner_bg
+        current_component = "continuous_learner"
+        _mark_component(current_component, "loading")
         continuous_learner_bg = ContinuousBackgroundLearner(
             vector_store=reasoning_engine.vector_store,
             embedding_model=reasoning_engine.embedding_model,
@@ -146,6 +197,7 @@ async def startup_event():
             web_scraper=reasoning_engine.multi_source_data.web_scraper
         )
         await continuous_learner_bg.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Continuous background learner initialized - learning 24/7")
         print("     [OK] Continuous background learner initialized\n")
 
@@ -153,11 +205,14 @@ async def startup_event():
         print("[7/7] Initializing User Feedback Fine-Tuner...")
         from ai_engine.user_feedback_finetuner import UserFeedbackFineTuner
         global feedback_finetuner
+        current_component = "feedback_finetuner"
+        _mark_component(current_component, "loading")
         feedback_finetuner = UserFeedbackFineTuner(
             vector_store=reasoning_engine.vector_store,
             embedding_model=reasoning_engine.embedding_model
         )
         await feedback_finetuner.initialize()
+        _mark_component(current_component, "ready")
         logger.info("User feedback fine-tuner initialized - learning from user interactions")
         print("     [OK] User feedback fine-tuner initialized\n")
 
@@ -165,6 +220,8 @@ async def startup_event():
         print("[8/8] Initializing Self-Learning System...")
         from ai_engine.self_learning_system import SelfLearningSystem
         global self_learning_system
+        current_component = "self_learning_system"
+        _mark_component(current_component, "loading")
         self_learning_system = SelfLearningSystem(
             vector_store=reasoning_engine.vector_store,
             embedding_model=reasoning_engine.embedding_model,
@@ -172,6 +229,7 @@ async def startup_event():
             web_scraper=reasoning_engine.multi_source_data.web_scraper
         )
         await self_learning_system.initialize()
+        _mark_component(current_component, "ready")
         logger.info("Self-learning system initialized - automated testing and improvement")
         print("     [OK] Self-learning system initialized\n")
 
@@ -211,6 +269,8 @@ async def startup_event():
         print("[SELF-LEARN] Automated testing and improvement running every 30 minutes.\n")
 
     except Exception as e:
+        if current_component:
+            _mark_component(current_component, "failed")
         logger.error(f"Error initializing AI components: {e}", exc_info=True)
         print("\n" + "="*70)
         print("[ERROR] INITIALIZATION FAILED")
@@ -221,10 +281,32 @@ async def startup_event():
         raise
 
 
+@app.on_event("startup")
+async def startup_event():
+    global startup_task
+
+    if not settings.lazy_startup:
+        await _initialize_components()
+        return
+
+
+    logger.info("Lazy startup enabled - HTTP server is up, loading AI components in the background")
+    startup_task = asyncio.create_task(_initialize_components())
+    startup_task.add_done_callback(_log_startup_failure)
+
+
+def _log_startup_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background initialization failed: {task.exception()}")
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     global reasoning_engine, feedback_finetuner, continuous_learner_bg, online_pretrainer
 
+    if startup_task and not startup_task.done():
+        startup_task.cancel()
+
     logger.info("💾 Saving all learned data before shutdown...")
 
     try:
@@ -281,6 +363,8 @@ class HealthResponse(BaseModel):
     version: str
     components: Dict[str, str]
     model_info: Optional[Dict[str, Any]] = None
+    ready: bool = False
+    readiness: Optional[Dict[str, str]] = None
 
 
 
@@ -567,14 +651,61 @@ async def health_check():
         logger.error(f"Health check error: {e}")
         components_status["error"] = str(e)
 
+    if any(component_status[name] == "failed" for name in READINESS_COMPONENTS):
+        status = "failed"
+    elif not is_service_warm():
+        status = "starting"
+    elif all(v == "healthy" for v in components_status.values()):
+        status = "healthy"
+    else:
+        status = "degraded"
+
     return HealthResponse(
-        status="healthy" if all(v == "healthy" for v in components_status.values()) else "degraded",
+        status=status,
         version="1.0.0",
         components=components_status,
-        model_info=model_info
+        model_info=model_info,
+        ready=is_service_warm(),
+        readiness=dict(component_status)
     )
 
 
+@app.get("/ready", response_model=Dict[str, Any])
+async def readiness_check():
+    ready = is_service_warm()
+    body = {
+        "ready": ready,
+        "components": dict(component_status),
+        "updated_at": dict(component_status_updated),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if not ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/metrics", response_model=Dict[str, Any])
+async def get_metrics():
+    metrics = {}
+
+    if reasoning_engine and reasoning_engine.embedding_model:
+        try:
+            metrics["embedding_model"] = reasoning_engine.embedding_model.get_stats()
+        except Exception as e:
+            logger.error(f"Error getting embedding model stats: {e}")
+            metrics["embedding_model"] = {"error": str(e)}
+
+    if reasoning_engine and reasoning_engine.vector_store:
+        try:
+            metrics["vector_store"] = reasoning_engine.vector_store.get_stats()
+        except Exception as e:
+            logger.error(f"Error getting vector store stats: {e}")
+            metrics["vector_store"] = {"error": str(e)}
+
+    metrics["timestamp"] = datetime.utcnow().isoformat()
+    return metrics
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     if not reasoning_engine:
@@ -0,0 +1,51 @@
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakeEmbeddingModel:
+
+    def __init__(self, dimension: int = 32):
+        self.dimension = dimension
+        self.calls = 0
+
+    def get_embedding_dimension(self) -> int:
+        return self.dimension
+
+    async def encode(self, texts, batch_size: int = 32, max_seq_length: int = None) -> np.ndarray:
+        self.calls += 1
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                seed = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16)
+                embeddings[row] += np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.clip(norms, 1e-12, None)
+
+
+@pytest.fixture
+def embedding_model():
+    return FakeEmbeddingModel()
+
+
+@pytest.fixture(params=[True, False], ids=["faiss", "numpy"])
+def vector_store_module(request, tmp_path, monkeypatch):
+    from ai_engine import vector_store
+    from config import settings
+
+    if request.param and not vector_store.FAISS_AVAILABLE:
+        pytest.skip("faiss is not installed")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(vector_store, "FAISS_AVAILABLE", request.param)
+    monkeypatch.setattr(settings, "vector_collections", "")
+    monkeypatch.setattr(settings, "vector_ann_index_type", "none")
+    monkeypatch.setattr(settings, "vector_near_duplicate_types", "lesson")
+    monkeypatch.setattr(settings, "vector_near_duplicate_threshold", 0.9)
+    monkeypatch.setattr(settings, "vector_retention_days", "")
+    return vector_store
@@ -0,0 +1,135 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+
+@pytest.fixture
+def ann_settings(vector_store_module, monkeypatch):
+    from config import settings
+
+    if not vector_store_module.FAISS_AVAILABLE:
+        pytest.skip("compressed indexes need the faiss backend")
+    monkeypatch.setattr(settings, "vector_ann_index_type", "sq8")
+    monkeypatch.setattr(settings, "vector_ann_promotion_threshold", 1000)
+    monkeypatch.setattr(settings, "vector_ann_min_recall", 0.8)
+    return settings
+
+
+async def _wait_for_build(collection):
+    while collection.ann.building:
+        await asyncio.sleep(0.01)
+
+
+def _vectors(count, dimension=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_sq8_index_is_promoted_and_persisted_with_the_snapshot(vector_store_module, ann_settings, embedding_model):
+    vectors = _vectors(1500)
+
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        collection = store.collections["default"]
+        await store.add_many([f"doc {i}" for i in range(1200)], [{"type": "fact"}] * 1200, vectors[:1200])
+        await _wait_for_build(collection)
+
+        stats = collection.get_stats()["index"]
+        assert stats["index_type"] == "sq8" and stats["builds"] == 1
+        assert stats["recall_at_k"] >= ann_settings.vector_ann_min_recall
+        assert stats["code_bytes_per_vector"] * 4 == stats["float32_bytes_per_vector"]
+        recall = stats["recall_at_k"]
+        await store.cleanup()
+
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        collection = store.collections["default"]
+        try:
+            stats = collection.get_stats()["index"]
+            assert stats["index_type"] == "sq8" and stats["loaded_from_disk"] and stats["builds"] == 0
+            assert stats["recall_at_k"] == recall and stats["ann_vectors"] == 1200
+            assert not collection.ann.building
+            assert collection.get_stats()["storage"]["mmap"]
+
+            await store.add_many([f"doc {i}" for i in range(1200, 1500)], [{"type": "fact"}] * 300, vectors[1200:])
+            assert collection.ann.index.ntotal == collection.index.ntotal == 1500
+            _, ids = collection.index.view.search(vectors[1400:1401], 1, collection.ann.row_index(collection.index.view))
+            assert ids[0, 0] == 1400
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_persisted_index_is_dropped_when_the_type_changes(vector_store_module, ann_settings, embedding_model, monkeypatch):
+    vectors = _vectors(1200, seed=1)
+
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        await store.add_many([f"doc {i}" for i in range(1200)], [{"type": "fact"}] * 1200, vectors)
+        await _wait_for_build(store.collections["default"])
+        await store.cleanup()
+
+        monkeypatch.setattr(ann_settings, "vector_ann_index_type", "fp16")
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        collection = store.collections["default"]
+        try:
+            await _wait_for_build(collection)
+            stats = collection.get_stats()["index"]
+            assert not stats["loaded_from_disk"] and stats["index_type"] == "fp16" and stats["builds"] == 1
+        finally:
+            await store.cleanup()
+
+        assert [path.name for path in collection.storage_path.glob("index.ann.*.faiss")] == [
+            f"index.ann.{collection.generation}.faiss"
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_waiting_writer_blocks_new_readers():
+    import threading
+    import time
+
+    from ai_engine.ann_index import ReadWriteLock
+
+    lock = ReadWriteLock()
+    events = []
+    first_reader_done = threading.Event()
+
+    def first_reader():
+        with lock.reading():
+            events.append("reader 1")
+            first_reader_done.wait(5)
+
+    def writer():
+        with lock.writing():
+            events.append("writer")
+
+    def second_reader():
+        with lock.reading():
+            events.append("reader 2")
+
+    threads = [threading.Thread(target=first_reader)]
+    threads[0].start()
+    while not events:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=writer))
+    threads[1].start()
+    while lock._writers_waiting == 0:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=second_reader))
+    threads[2].start()
+
+    time.sleep(0.05)
+    assert events == ["reader 1"]
+    first_reader_done.set()
+    for thread in threads:
+        thread.join(5)
+    assert events == ["reader 1", "writer", "reader 2"]
@@ -0,0 +1,45 @@
+import asyncio
+
+import numpy as np
+
+from ai_engine.encoder_service import MicroBatchingEncoder
+
+
+def _encode(texts, batch_size, max_seq_length):
+    return np.arange(len(texts), dtype=np.float32).reshape(-1, 1)
+
+
+def test_encode_errors_reach_every_caller_and_worker_survives():
+    async def scenario():
+        encoder = MicroBatchingEncoder(lambda texts, batch_size, max_seq_length: 1 / 0, max_wait_ms=20)
+        try:
+            results = await asyncio.gather(encoder.encode(["a"]), encoder.encode(["b"]), return_exceptions=True)
+            assert all(isinstance(result, ZeroDivisionError) for result in results)
+
+            encoder.encode_fn = _encode
+            assert (await encoder.encode(["c"])).shape == (1, 1)
+        finally:
+            await encoder.close()
+
+    asyncio.run(scenario())
+
+
+def test_errors_outside_encode_fn_do_not_hang_callers():
+    async def scenario():
+        encoder = MicroBatchingEncoder(lambda texts, batch_size, max_seq_length: np.zeros((0, 1)), max_wait_ms=20)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(encoder.encode(["a"]), encoder.encode(["b"], max_seq_length=8), return_exceptions=True),
+                timeout=5
+            )
+            assert all(isinstance(result, IndexError) for result in results)
+
+            worker = encoder._worker
+            encoder.encode_fn = _encode
+            embeddings = await asyncio.wait_for(encoder.encode(["x", "y", "x"]), timeout=5)
+            assert embeddings[:, 0].tolist() == [0.0, 1.0, 0.0]
+            assert encoder._worker is worker
+        finally:
+            await encoder.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,23 @@
+import numpy as np
+
+from ai_engine.metadata_index import MetadataIndex
+
+
+def test_postings_stay_ordered_and_returned_arrays_are_not_mutated():
+    index = MetadataIndex(["type"])
+    for vector_id in range(10):
+        index.add(vector_id, {"type": "fact" if vector_id % 2 else "lesson"})
+
+    facts = index.ids_for("type", "fact")
+    assert facts.tolist() == [1, 3, 5, 7, 9]
+    assert index.newest("type", "fact", 2).tolist() == [9, 7]
+
+    index.add(10, {"type": "fact"})
+    index.remove(3, {"type": "fact"})
+    index.update(4, {"type": "lesson"}, {"type": "fact"})
+
+    assert facts.tolist() == [1, 3, 5, 7, 9]
+    assert index.ids_for("type", "fact").tolist() == [1, 4, 5, 7, 9, 10]
+    assert index.newest("type", "fact").tolist() == [10, 9, 7, 5, 4, 1]
+    assert index.values("type") == {"fact": 6, "lesson": 4}
+    assert np.array_equal(index.candidates({"type": "lesson"}), [0, 2, 6, 8])
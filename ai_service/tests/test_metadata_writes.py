@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from ai_engine.metadata_store import SqliteMetadataStore
+
+
+def test_metadata_writes_run_off_the_event_loop_in_one_batch(vector_store_module, embedding_model, monkeypatch):
+    calls = []
+    for name in ("extend", "update_many", "delete"):
+        original = getattr(SqliteMetadataStore, name)
+
+        def record(self, *args, _name=name, _original=original):
+            calls.append((_name, threading.current_thread()))
+            return _original(self, *args)
+
+        monkeypatch.setattr(SqliteMetadataStore, name, record)
+
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            ids = await store.add_many(["a b", "c d", "e f"], [{"type": "fact"}] * 3)
+            del calls[:]
+
+            await store.add_many(["a b", "c d", "e f", "g h"], [{"type": "fact", "source": "x"}] * 4)
+            assert [name for name, _ in calls] == ["extend", "update_many"]
+
+            await store.delete(ids[:2], "default")
+            assert [name for name, _ in calls][-1] == "delete"
+            assert all(thread is not threading.main_thread() for _, thread in calls)
+
+            hits = await store.search("e f", top_k=1, threshold=-1.0)
+            assert hits[0]["id"] == ids[2] and hits[0]["source"] == "x"
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from ai_engine.onnx_embedding_backend import OnnxEmbeddingBackend
+
+
+class _FakeSentenceTransformer(list):
+    tokenizer = None
+    max_seq_length = 128
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = OnnxEmbeddingBackend(_FakeSentenceTransformer(), "org/model", export_dir=str(tmp_path))
+    backend.export_dir.mkdir(parents=True)
+    return backend
+
+
+def test_interrupted_export_leaves_no_reusable_artifact(backend):
+    def crash(path):
+        path.write_bytes(b"partial")
+        raise RuntimeError("export interrupted")
+
+    with pytest.raises(RuntimeError):
+        backend._write_artifact(backend.model_path, crash)
+
+    assert not backend.model_path.exists()
+    assert not backend._is_complete(backend.model_path)
+
+
+def test_artifact_is_reused_only_while_it_matches_its_digest(backend):
+    backend._write_artifact(backend.model_path, lambda path: path.write_bytes(b"onnx graph"))
+    assert backend._is_complete(backend.model_path)
+    assert [path.name for path in backend.export_dir.glob("*.tmp.onnx")] == []
+
+    backend.model_path.write_bytes(b"onnx gr")
+    assert not backend._is_complete(backend.model_path)
+
+
+def test_artifact_without_digest_is_rebuilt(backend):
+    backend.model_path.write_bytes(b"onnx graph from an older release")
+    assert not backend._is_complete(backend.model_path)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+from ai_engine.onnx_embedding_backend import OnnxEmbeddingBackend, PARITY_PROBE_TEXTS
+from config import settings
+
+
+@pytest.fixture(scope="module")
+def model():
+    try:
+        return sentence_transformers.SentenceTransformer(settings.embedding_model, device="cpu")
+    except OSError as e:
+        pytest.skip(f"{settings.embedding_model} is not available: {e}")
+
+
+def _encode_torch(model, texts, batch_size=32):
+    return model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+
+
+@pytest.mark.parametrize("quantize", [False, True], ids=["fp32", "int8"])
+def test_onnx_embeddings_match_torch(model, tmp_path, quantize):
+    backend = OnnxEmbeddingBackend(model, settings.embedding_model, export_dir=str(tmp_path), quantize=quantize)
+    backend.prepare()
+
+    reference = _encode_torch(model, PARITY_PROBE_TEXTS)
+    candidate = backend.encode(PARITY_PROBE_TEXTS)
+
+    assert candidate.shape == reference.shape
+    assert np.allclose(np.linalg.norm(candidate, axis=1), 1.0, atol=1e-5)
+    assert np.min(np.sum(reference * candidate, axis=1)) >= settings.embedding_onnx_min_cosine
+    assert backend.check_parity(lambda texts, batch_size: _encode_torch(model, texts, batch_size)) >= settings.embedding_onnx_min_cosine
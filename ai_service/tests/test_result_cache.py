@@ -0,0 +1,28 @@
+import asyncio
+
+
+def test_cached_results_are_invalidated_by_adds_and_deletes(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            first = await store.add("miami condo prices", {"type": "fact"})
+            query = "miami condo prices rising"
+
+            hits = await store.search(query, top_k=5, threshold=-1.0)
+            assert [hit["id"] for hit in hits] == [first]
+            assert await store.search(query, top_k=5, threshold=-1.0) == hits
+            assert store.get_stats()["result_cache"]["hits"] == 1
+
+            second = await store.add("miami condo prices rising", {"type": "fact"})
+            hits = await store.search(query, top_k=5, threshold=-1.0)
+            assert [hit["id"] for hit in hits] == [second, first]
+
+            await store.delete([second], "default")
+            hits = await store.search(query, top_k=5, threshold=-1.0)
+            assert [hit["id"] for hit in hits] == [first]
+            assert store.get_stats()["result_cache"]["hits"] == 1
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+
+
+def test_exact_duplicates_are_upserted(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            first = await store.add("cap rate in nyc", {"type": "fact", "source": "a"})
+            assert await store.add("Cap rate in NYC ", {"type": "fact", "source": "b"}) == first
+            assert await store.add("cap rate in nyc", {"type": "other"}) != first
+
+            hits = await store.search("cap rate in nyc", top_k=5, filter_metadata={"type": "fact"}, threshold=-1.0)
+            assert [hit["id"] for hit in hits] == [first]
+            assert hits[0]["source"] == "b"
+            assert store.get_stats()["duplicates_skipped"] == 1
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_near_duplicates_merge_into_the_canonical_entry(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            canonical = await store.add("alpha beta gamma delta", {"type": "lesson", "confidence": 0.5})
+            assert await store.add("alpha  beta gamma delta", {"type": "lesson", "confidence": 0.5}) == canonical
+            assert await store.add("zeta eta theta", {"type": "lesson"}) != canonical
+
+            entry = store.find_by("type", "lesson", collection="default")[-1]
+            assert entry["id"] == canonical and entry["merge_count"] == 2 and entry["confidence"] == 0.75
+            assert store.get_stats()["near_duplicates_merged"] == 1
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_readding_a_merged_text_after_deleting_its_canonical_entry(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            canonical = await store.add("alpha beta gamma delta", {"type": "lesson"})
+            assert await store.add("alpha  beta gamma delta", {"type": "lesson"}) == canonical
+            assert await store.delete([canonical], "default") == 1
+
+            readded = await store.add("alpha  beta gamma delta", {"type": "lesson"})
+            assert readded != canonical
+            hits = await store.search("alpha beta gamma delta", top_k=1, threshold=-1.0)
+            assert hits[0]["id"] == readded and hits[0]["text"] == "alpha  beta gamma delta"
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_upserts_ignore_bookkeeping_keys_only(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            metadata = {"type": "fact", "learned_at": "2024-01-01", "published_at": "2024-01-01"}
+            vector_id = await store.add("miami condo prices", metadata)
+
+            await store.add("miami condo prices", {**metadata, "learned_at": "2024-02-01"})
+            hits = await store.search("miami condo prices", top_k=1, threshold=-1.0)
+            assert hits[0]["id"] == vector_id and hits[0]["learned_at"] == "2024-01-01"
+
+            await store.add("miami condo prices", {**metadata, "learned_at": "2024-03-01", "published_at": "2024-03-01"})
+            hits = await store.search("miami condo prices", top_k=1, threshold=-1.0)
+            assert hits[0]["published_at"] == "2024-03-01" and hits[0]["learned_at"] == "2024-03-01"
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
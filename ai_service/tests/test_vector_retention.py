@@ -0,0 +1,36 @@
+import asyncio
+
+from config import settings
+
+
+def test_expired_entries_are_removed_and_stay_removed(vector_store_module, embedding_model, monkeypatch):
+    monkeypatch.setattr(settings, "vector_retention_days", "continuous_learning=30")
+
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        stale, fresh, other = await store.add_many(
+            ["miami condo prices", "atlanta rental yield", "boston office vacancy"],
+            [
+                {"type": "continuous_learning", "timestamp": "2000-01-01T00:00:00"},
+                {"type": "continuous_learning"},
+                {"type": "fact", "timestamp": "2000-01-01T00:00:00"}
+            ]
+        )
+
+        assert await store.expire_stale() == 1
+        assert store.get_stats()["expired"] == 1
+        hits = await store.search("miami condo prices", top_k=5, threshold=-1.0)
+        assert stale not in [hit["id"] for hit in hits]
+        await store.cleanup()
+
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            assert store.get_stats()["vectors"] == 2
+            assert store.find_by("type", "continuous_learning")[0]["id"] == fresh
+            assert await store.add("miami condo prices", {"type": "continuous_learning"}) not in (stale, fresh, other)
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+
+def _store_files(collection):
+    return sorted(path for path in collection.storage_path.iterdir() if path.name.endswith((".npy", ".pkl")))
+
+
+def test_corrupt_snapshot_rebuilds_vectors_from_metadata(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        ids = await store.add_many(
+            ["cap rate in nyc", "miami condo prices", "atlanta rental yield"],
+            [{"type": "fact"}, {"type": "fact"}, {"type": "fact"}]
+        )
+        await store.cleanup()
+
+        for path in _store_files(store.collections["default"]):
+            path.write_bytes(b"not a snapshot")
+
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            assert store.get_stats()["vectors"] == 3
+            hits = await store.search("miami condo prices", top_k=1, threshold=-1.0)
+            assert hits[0]["id"] == ids[1] and hits[0]["text"] == "miami condo prices"
+            assert await store.add("boston office vacancy", {"type": "fact"}) not in ids
+        finally:
+            await store.cleanup()
+
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            assert store.get_stats()["vectors"] == 4
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_load_does_not_block_the_event_loop(vector_store_module, embedding_model, monkeypatch):
+    for store_class in (vector_store_module.VectorCollection, vector_store_module.SimpleVectorStore):
+        load_snapshot = store_class._load_snapshot
+
+        def slow_load_snapshot(self, _load_snapshot=load_snapshot):
+            time.sleep(0.3)
+            return _load_snapshot(self)
+
+        monkeypatch.setattr(store_class, "_load_snapshot", slow_load_snapshot)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        task.cancel()
+        await store.cleanup()
+        assert ticks >= 10
+
+    asyncio.run(scenario())
@@ -0,0 +1,40 @@
+import asyncio
+
+
+async def _crash(store):
+    for collection in store.collections.values():
+        backing = collection.simple_store or collection
+        await backing.wal.close()
+        backing.metadata.close()
+
+
+def test_unsnapshotted_writes_are_replayed_after_a_crash(vector_store_module, embedding_model):
+    async def scenario():
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        kept = await store.add("cap rate in nyc", {"type": "fact"})
+        await store.cleanup()
+
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        added = await store.add_many(
+            ["miami condo prices", "atlanta rental yield", "boston office vacancy"],
+            [{"type": "fact"}, {"type": "fact", "source": "a"}, {"type": "fact"}]
+        )
+        await store.update_metadata(added[1], {"source": "b"}, "default")
+        await store.delete([kept, added[2]], "default")
+        await _crash(store)
+
+        store = vector_store_module.VectorStore(embedding_model)
+        await store.initialize()
+        try:
+            assert store.get_stats()["vectors"] == 2
+            assert store.get_stats()["collections"]["default"]["wal"]["replayed_records"] == 3
+            hits = await store.search("atlanta rental yield", top_k=5, threshold=-1.0)
+            assert [hit["id"] for hit in hits] == added[:2][::-1]
+            assert hits[0]["source"] == "b"
+            assert await store.add("cap rate in nyc", {"type": "fact"}) not in [kept] + added
+        finally:
+            await store.cleanup()
+
+    asyncio.run(scenario())